@@ -0,0 +1,56 @@
+""" store / get / move on a hub keyed by plain int addresses, by GloomPointer handles,
+    and by pointers that are whole GloomObjects, the way GloomPointer used to be. get
+    builds a fresh pointer per lookup, as dereferencing does, which old-style pointers
+    can never find since they hash by identity.
+
+    PYTHONPATH=. python benchmarks/bench_addresses.py [addresses]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomAffinity, GloomObject, GloomPointer
+from gloom.hub import GloomHub
+
+
+SCRATCH = GloomHub()
+
+
+def object_pointer(address):
+    return GloomObject(address, affinity=GloomAffinity.REFERENCE, heap=SCRATCH)
+
+
+def run(make, addresses):
+    hub = GloomHub()
+    value = object()
+    keys = [make(address) for address in range(addresses)]
+    timings = []
+
+    start = perf_counter()
+    for key in keys:
+        hub.store(key, value)
+    timings.append(perf_counter() - start)
+
+    start = perf_counter()
+    hits = 0
+    for address in range(addresses):
+        if hub.get(make(address)) is not None:
+            hits += 1
+    timings.append(perf_counter() - start)
+
+    start = perf_counter()
+    for address, key in enumerate(keys):
+        hub.store(make(address + addresses), hub.pop(key))
+    timings.append(perf_counter() - start)
+    return timings, hits
+
+
+if __name__ == "__main__":
+    addresses = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{addresses:,} addresses")
+    for label, make in (("GloomObject pointers", object_pointer), ("GloomPointer", GloomPointer), ("int", int)):
+        (stored, got, moved), hits = run(make, addresses)
+        SCRATCH.free_all()
+        print(
+            f"{label:>20}: store {stored:5.2f}s  get {got:5.2f}s ({hits:,} hits)  move {moved:5.2f}s"
+        )
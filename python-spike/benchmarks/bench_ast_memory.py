@@ -0,0 +1,42 @@
+""" Bytes per statement for the parsed program: the tree of slotted nodes against the
+    flat ASTArena, with the source size for scale
+
+    PYTHONPATH=. python benchmarks/bench_ast_memory.py [statements]
+"""
+
+import sys
+import tracemalloc
+
+from gloom.parser import Lexer, Parser
+
+
+STATEMENTS = (
+    "((1 + 2) * 3) :print.\n",
+    ":set x :to 5.\n",
+    ":set y :to x :at 6.0.\n",
+    ":set x :to #(1 2 3 #(4.0 5)).\n",
+    "y :print.\n",
+)
+
+
+def measure(tokens, arena):
+    tracemalloc.start()
+    ast = Parser(tokens).parse_program(arena=arena)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ast, size
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    program = "".join(STATEMENTS[i % len(STATEMENTS)] for i in range(statements))
+    tokens = Lexer().lex(program)
+
+    tree, tree_size = measure(tokens, arena=False)
+    del tree
+    arena, arena_size = measure(tokens, arena=True)
+
+    print(f"{statements:,} statements, {arena.node_count:,} nodes")
+    print(f"{'source':>8}: {len(program) / statements:8.1f} bytes/statement")
+    print(f"{'tree':>8}: {tree_size / statements:8.1f} bytes/statement")
+    print(f"{'arena':>8}: {arena_size / statements:8.1f} bytes/statement")
@@ -0,0 +1,38 @@
+""" Startup cost of getting a parsed program: parsing from scratch, a ParseCache that has
+    to read its cache directory (a fresh worker), and an in-process hit
+
+    PYTHONPATH=. python benchmarks/bench_cache.py [statements]
+"""
+
+import sys
+import tempfile
+from time import perf_counter
+
+from gloom.cache import ParseCache
+from gloom.parser import Parser
+
+from bench_ast_memory import STATEMENTS
+
+
+def timed(function, *args):
+    start = perf_counter()
+    function(*args)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    program = "".join(STATEMENTS[i % len(STATEMENTS)] for i in range(statements))
+
+    with tempfile.TemporaryDirectory() as directory:
+        ParseCache(directory=directory).parse(program)
+        worker = ParseCache(directory=directory)
+        results = (
+            ("parse", timed(Parser().parse, program)),
+            ("disk hit", timed(worker.arena, program)),
+            ("memory hit", timed(worker.arena, program)),
+            ("memory hit + materialize", timed(worker.parse, program)),
+        )
+        print(f"{statements:,} statements, {worker}")
+        for name, seconds in results:
+            print(f"{name:>25}: {seconds * 1000:9.1f}ms")
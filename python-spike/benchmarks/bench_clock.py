@@ -0,0 +1,63 @@
+""" Throughput of @ref'd calls, object creation and str(o) with each clock, against
+    stamping with datetime.now() the way GloomObject used to
+
+    PYTHONPATH=. python benchmarks/bench_clock.py [objects]
+"""
+
+import sys
+from datetime import datetime
+from time import perf_counter
+
+from gloom import clock
+from gloom.gloom import GloomObject, ref
+
+
+class DatetimeClock:
+    """ The old behaviour: a datetime per stamp, shown as is """
+
+    now = staticmethod(datetime.now)
+
+    def display(self, stamp):
+        return stamp
+
+
+@ref
+def touch(self):
+    pass
+
+
+def measure(objects):
+    o = GloomObject()
+    start = perf_counter()
+    for _ in range(objects):
+        touch(o)
+    touched = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(objects):
+        o = GloomObject()
+    created = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(objects):
+        str(o)
+    printed = perf_counter() - start
+    return touched, created, printed
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{objects:,} each of: @ref'd calls, objects created, str() of one object")
+    baseline = None
+    for label, c in (
+        ("datetime.now", DatetimeClock()),
+        ("monotonic", clock.MonotonicClock()),
+        ("tick", clock.TickClock()),
+    ):
+        clock.use(c)
+        timings = measure(objects)
+        baseline = baseline or timings
+        print(f"{label:>14}:" + "".join(
+            f"  {objects / elapsed:>10,.0f} {unit}/s ({base / elapsed:.2f}x)"
+            for unit, elapsed, base in zip(("ref", "creates", "str"), timings, baseline)
+        ))
@@ -0,0 +1,56 @@
+""" Cloning instances from one template: copy-on-write clone_to against building each
+    clone through GloomObject() and copying its fields and methods, the way clone_to
+    used to (plus the methods copy it needed to keep clones from changing the template)
+
+    PYTHONPATH=. python benchmarks/bench_clone.py [clones]
+"""
+
+import sys
+import tracemalloc
+from time import perf_counter
+
+from gloom.dispatch import MethodTable
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def eager_clone(self, location):
+    o = GloomObject(receiver=self.receiver, location=location, heap=self.objects)
+    o.references = self.references
+    o.value = self.value
+    o.created_at = self.created_at
+    o.last_referenced = self.last_referenced
+    o.methods = MethodTable(self.methods)
+    return o
+
+
+def cow_clone(self, location):
+    return self.clone_to(location)
+
+
+def measure(clone, clones):
+    heap = GloomHub()
+    methods = {f"method{i}": (lambda self: self) for i in range(8)}
+    template = GloomObject(value="template", methods=methods, heap=heap)
+
+    start = perf_counter()
+    for location in range(1, clones + 1):
+        clone(template, location)
+    elapsed = perf_counter() - start
+
+    heap = GloomHub()
+    template = GloomObject(value="template", methods=methods, heap=heap)
+    tracemalloc.start()
+    for location in range(1, clones + 1):
+        clone(template, location)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, size
+
+
+if __name__ == "__main__":
+    clones = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{clones:,} clones of a template with 8 methods")
+    for label, clone in (("eager", eager_clone), ("copy-on-write", cow_clone)):
+        elapsed, size = measure(clone, clones)
+        print(f"{label:>14}: {elapsed:.2f}s ({clones / elapsed:,.0f} clones/s), {size / clones:.0f} bytes/clone")
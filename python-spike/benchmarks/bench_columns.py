@@ -0,0 +1,55 @@
+""" Bulk referencing and heap stats, one object at a time on a GloomHub against whole
+    columns at a time on a ColumnarHub
+
+    PYTHONPATH=. python benchmarks/bench_columns.py [objects]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom import clock
+from gloom.columns import ColumnarHub
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def fill(hub, objects):
+    for location in range(objects):
+        GloomObject(location=location, heap=hub)
+    return hub
+
+
+def loop_ref_all(hub):
+    now = clock.now()
+    for o in hub.objects.values():
+        o.references += 1
+        o.last_referenced = now
+
+
+def loop_sum(hub):
+    return sum(o.references for o in hub.objects.values())
+
+
+def time(label, f, *args):
+    start = perf_counter()
+    f(*args)
+    elapsed = perf_counter() - start
+    print(f"{label:>28}: {elapsed * 1000:8.1f}ms")
+    return elapsed
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{objects:,} objects")
+    hub = fill(GloomHub(), objects)
+    columns = fill(ColumnarHub(), objects)
+
+    looped = time("ref all, object loop", loop_ref_all, hub)
+    vectorized = time("ref all, columns", columns.ref_all)
+    print(f"{'':>28}  {looped / vectorized:.1f}x")
+
+    looped = time("sum references, object loop", loop_sum, hub)
+    vectorized = time("sum references, column", sum, columns.reference_counts)
+    print(f"{'':>28}  {looped / vectorized:.1f}x")
+
+    time("snapshot", columns.snapshot)
@@ -0,0 +1,60 @@
+""" Method dispatch on a GloomObject: joining the selector string on every send, as
+    GloomObject used to, against interned selectors and a CallSite's inline cache
+
+    PYTHONPATH=. python benchmarks/bench_dispatch.py [sends]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.dispatch import CallSite
+from gloom.gloom import GloomObject
+
+
+def at_put(self, at, put):
+    return put
+
+
+def uncached(o, message):
+    """ What handle_keyword_message did before call sites """
+    selector = ":".join(message.keys())
+    if (m := o.methods.get(selector)) is not None:
+        return m(o, **message)
+
+
+def time(label, sends, f):
+    start = perf_counter()
+    f()
+    elapsed = perf_counter() - start
+    print(f"{label:>24}: {elapsed:.2f}s ({sends / elapsed:,.0f} sends/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    sends = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    # several receivers with their own method tables make the call sites polymorphic
+    receivers = [GloomObject(methods={"at:put": at_put}) for _ in range(3)]
+    message = {"at": 1, "put": 2}
+    site = CallSite(("at", "put"))
+    rounds = range(sends // len(receivers))
+
+    def old_keyword():
+        for _ in rounds:
+            for o in receivers:
+                uncached(o, message)
+
+    def new_keyword():
+        for _ in rounds:
+            for o in receivers:
+                o.handle_keyword_message(message)
+
+    def perform():
+        for _ in rounds:
+            for o in receivers:
+                o.perform(site, 1, 2)
+
+    print(f"{sends:,} sends across {len(receivers)} method tables")
+    baseline = time("join + dict lookup", sends, old_keyword)
+    for label, f in (("keyword, interned", new_keyword), ("perform(site)", perform)):
+        elapsed = time(label, sends, f)
+        print(f"{'':>24}  {baseline / elapsed:.2f}x")
@@ -0,0 +1,57 @@
+""" Dumping a heap to a file: building repr(hub) by += the way GloomHub used to and
+    writing it in one go, against streaming write_repr in batches. Memory is the
+    tracemalloc peak while dumping.
+
+    PYTHONPATH=. python benchmarks/bench_dump.py [objects]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def concatenated(hub, f):
+    hub.ref_all()
+    representation = "\t"
+    for key in hub.objects:
+        obj_repr = hub.get(key).safe_repr()
+        representation += f"{key} : {obj_repr}"
+    f.write(representation)
+
+
+def streamed(hub, f):
+    hub.write_repr(f)
+
+
+def sampled(hub, f):
+    hub.write_repr(f, limit=1_000, every=max(1, len(hub) // 1_000))
+
+
+def measure(label, dump, hub, path):
+    tracemalloc.start()
+    start = perf_counter()
+    with open(path, "w") as f:
+        dump(hub, f)
+    elapsed = perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    print(f"{label:>14}: {elapsed:6.2f}s, peak {peak / 2**20:8.1f} MiB, wrote {size / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    hub = GloomHub()
+    for location in range(objects):
+        GloomObject(location=location, heap=hub)
+
+    print(f"{objects:,} objects (timings include tracemalloc overhead)")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "heap.txt")
+        for label, dump in (("concatenated", concatenated), ("streamed", streamed), ("1k sample", sampled)):
+            measure(label, dump, hub, path)
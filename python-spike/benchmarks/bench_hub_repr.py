@@ -0,0 +1,46 @@
+""" repr() of a hub whose objects all live in it, with the running reference total
+    against summing every object's references on each global_references call, the way
+    GloomHub used to. Summing makes the repr quadratic, so it only runs on small hubs.
+
+    PYTHONPATH=. python benchmarks/bench_hub_repr.py [objects]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+class SummingHub(GloomHub):
+
+    @property
+    def global_references(self):
+        total = 0
+        for location in self.objects:
+            total += self.objects[location].references
+        return total
+
+
+def fill(hub, objects):
+    for location in range(objects):
+        GloomObject(location=location, heap=hub)
+    return hub
+
+
+def time_repr(hub):
+    start = perf_counter()
+    repr(hub)
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sizes = [size for size in (1_000, 2_000, 5_000) if size < largest] + [largest]
+    for size in sizes:
+        running = time_repr(fill(GloomHub(), size))
+        line = f"{size:>9,} objects: running total {running:.3f}s"
+        if size <= 5_000:
+            summing = time_repr(fill(SummingHub(), size))
+            line += f", summing {summing:.3f}s ({summing / running:.0f}x)"
+        print(line)
@@ -0,0 +1,46 @@
+""" Tokens per second for Lexer against the original CharacterLexer
+
+    PYTHONPATH=. python benchmarks/bench_lexer.py [statements]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.parser import Lexer, CharacterLexer
+
+
+STATEMENTS = (
+    "((1 + 2) * 3) :print.\n",
+    ":set x :to 5.\n",
+    ":set y :to x :at 6.0.\n",
+    ":set x :to #(1 2 3 #(4.0 5)).\n",
+    ":set greeting :to 'hello world'.\n",
+    "y :print.\n",
+)
+
+
+def generate(statements):
+    return "".join(
+        STATEMENTS[i % len(STATEMENTS)] for i in range(statements)
+    )
+
+
+def measure(lexer_class, program):
+    start = perf_counter()
+    tokens = lexer_class().lex(program)
+    elapsed = perf_counter() - start
+    return tokens, elapsed
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    program = generate(statements)
+    print(f"{len(program) / 1e6:.1f} MB, {statements} statements")
+
+    baseline_tokens, baseline = measure(CharacterLexer, program)
+    tokens, elapsed = measure(Lexer, program)
+    assert tokens == baseline_tokens
+
+    for name, seconds in (("CharacterLexer", baseline), ("Lexer", elapsed)):
+        print(f"{name:>15}: {len(tokens) / seconds:>12,.0f} tokens/s ({seconds:.2f}s)")
+    print(f"{'speedup':>15}: {baseline / elapsed:.1f}x")
@@ -0,0 +1,70 @@
+""" Queueing messages for an object that isn't listening and then working through them:
+    a list inbox emptied one receive() at a time from the back, the way GloomObject
+    used to, against the deque Mailbox emptied front first by drain()
+
+    PYTHONPATH=. python benchmarks/bench_mailbox.py [messages]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def at_put(self, at, put):
+    return put
+
+
+def list_send(o, message):
+    """ What send() did before mailboxes, the record's stack standing in for the old list inbox """
+    o.record.stack.append(message)
+    if o.listening:
+        return list_receive(o, o.record.stack)
+
+
+def list_receive(o, inbox):
+    """ What receive() did before mailboxes """
+    if not inbox:
+        return
+    return o.handle_message(inbox.pop())
+
+
+def time(label, messages, f):
+    start = perf_counter()
+    f()
+    elapsed = perf_counter() - start
+    print(f"{label:>24}: {elapsed:.2f}s ({messages / elapsed:,.0f} messages/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    heap = GloomHub()
+    o = GloomObject(heap=heap, methods={"at:put": at_put})
+    o.listening = False
+    message = {"at": 1, "put": 2}
+    sends = range(messages)
+
+    inbox = o.record.stack
+
+    def old_send():
+        for _ in sends:
+            list_send(o, message)
+
+    def old_receive():
+        while inbox:
+            list_receive(o, inbox)
+
+    def new_send():
+        for _ in sends:
+            o.send(message)
+
+    print(f"{messages:,} messages queued, then received")
+    for label, (old, new) in (
+        ("send", (old_send, new_send)),
+        ("receive", (old_receive, o.drain)),
+    ):
+        baseline = time(f"{label}, list", messages, old)
+        elapsed = time(f"{label}, mailbox", messages, new)
+        print(f"{'':>24}  {baseline / elapsed:.2f}x")
@@ -0,0 +1,66 @@
+""" Sending keyword messages: a fresh dict per send, classified with isinstance and
+    joined into a selector on delivery, against a GloomMessage made per send and one
+    GloomMessage made once and sent over and over. Timed delivered straight away (the
+    object is listening) and queued then drained.
+
+    PYTHONPATH=. python benchmarks/bench_message.py [sends]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.message import GloomMessage
+
+
+def at_put(self, at, put):
+    return put
+
+
+def time(label, sends, f):
+    start = perf_counter()
+    f()
+    elapsed = perf_counter() - start
+    print(f"{label:>28}: {elapsed:.2f}s ({sends / elapsed:,.0f} sends/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    sends = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    o = GloomObject(heap=GloomHub(), methods={"at:put": at_put})
+    keywords = ("at", "put")
+    rounds = range(sends)
+
+    def dicts():
+        for i in rounds:
+            o.send({"at": i, "put": i})
+
+    def messages():
+        keyword = GloomMessage.keyword
+        for i in rounds:
+            o.send(keyword(keywords, (i, i)))
+
+    def reused():
+        """ What a sender that builds its message once would send """
+        message = GloomMessage.keyword(keywords, (0, 0))
+        for _ in rounds:
+            o.send(message)
+
+    def queued(f):
+        def run():
+            o.listening = False
+            f()
+            o.drain()
+            o.listening = True
+        return run
+
+    print(f"{sends:,} keyword sends")
+    for label, (old, *new) in (
+        ("delivered", (dicts, messages, reused)),
+        ("queued", (queued(dicts), queued(messages), queued(reused))),
+    ):
+        baseline = time(f"{label}, dicts", sends, old)
+        for kind, f in zip(("GloomMessages", "one GloomMessage"), new):
+            elapsed = time(f"{label}, {kind}", sends, f)
+            print(f"{'':>28}  {baseline / elapsed:.2f}x")
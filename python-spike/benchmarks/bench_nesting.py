@@ -0,0 +1,123 @@
+""" Parse time for nested ((1 + 2) * 3)-style expressions, predictive Parser against the
+    exception-driven receiver parsing it replaced
+
+    PYTHONPATH=. python benchmarks/bench_nesting.py [statements] [depth]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.parser import Lexer, Parser, Token, MessageArgumentNode
+
+
+class BacktrackingParser(Parser):
+    """ Parser as it was before it became predictive: receivers are parsed by trying
+        "(" and backing out on SyntaxError, and eof/peek lean on IndexError.
+    """
+
+    def eof(self):
+        try:
+            self.tokens[self.position]
+            return False
+        except IndexError:
+            return True
+
+
+    @property
+    def current_tokentype(self):
+        return self.tokens[self.position][0]
+
+
+    def consume(self, kind):
+        if self.current_tokentype == kind:
+            self.advance()
+        else:
+            raise SyntaxError(f"weird, I expected {kind}, but got {self.current_tokentype} instead")
+
+
+    def peek(self, kinds):
+        self.advance()
+        if self.eof():
+            self.retreat()
+            return False
+        is_of_kind = self.current_tokentype in kinds
+        self.retreat()
+        return is_of_kind
+
+
+    def parse_receiver(self):
+        try:
+            self.consume(Token.LPAREN)
+            receiver = self.parse_message_send()
+            self.consume(Token.RPAREN)
+            return receiver
+        except SyntaxError:
+            return self.parse_value()
+
+
+    def parse_unary_or_named_argument(self):
+        values = [Token.LPAREN, Token.STRING, Token.NUMBER, Token.BOOLEAN, Token.OBJECT, Token.HASH]
+        if not self.peek(values):
+            value = MessageArgumentNode(self.current_tokenvalue, [])
+            self.advance()
+            return value
+        return self.parse_binary_argument()
+
+
+    def parse_arguments(self):
+        arguments = []
+        while not self.eof() and self.current_tokentype not in (Token.PERIOD, Token.RPAREN):
+            match self.current_tokentype:
+                case Token.NAMED_PARAMETER:
+                    arguments.append(self.parse_unary_or_named_argument())
+                case Token.BINARY_MESSAGE:
+                    arguments.append(self.parse_binary_argument())
+        return arguments
+
+
+    def parse_value(self):
+        match self.current_tokentype:
+            case Token.NUMBER:
+                return self.parse_number()
+            case Token.STRING:
+                return self.parse_string()
+            case Token.HASH:
+                return self.parse_array()
+            case Token.BOOLEAN:
+                return self.parse_boolean()
+            case Token.OBJECT:
+                return self.parse_object()
+            case Token.LPAREN:
+                self.consume(Token.LPAREN)
+                value = self.parse_message_send()
+                self.consume(Token.RPAREN)
+                return value
+            case _:
+                raise Exception(f"unexpected {self.current_token}")
+
+
+def nested(depth):
+    expression = "1"
+    for i in range(depth):
+        expression = f"({expression} {'+*'[i % 2]} {i + 2})"
+    return f"{expression} :print.\n"
+
+
+def measure(parser_class, tokens):
+    start = perf_counter()
+    parser_class(tokens).parse_program()
+    return perf_counter() - start
+
+
+if __name__ == "__main__":
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    for name, statement in (("flat", "x :print.\n"), (f"depth {depth}", nested(depth))):
+        tokens = Lexer().lex(statement * statements)
+        baseline = measure(BacktrackingParser, tokens)
+        elapsed = measure(Parser, tokens)
+        print(
+            f"{name:>10}: backtracking {baseline:.3f}s, predictive {elapsed:.3f}s "
+            f"({baseline / elapsed:.2f}x)"
+        )
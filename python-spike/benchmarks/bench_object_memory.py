@@ -0,0 +1,58 @@
+""" Bytes per GloomObject and objects allocated per second. Lazy objects live in one
+    shared heap and only get their side record, names and methods once they're used.
+    Eager objects get all of that up front plus a hub of their own, which is roughly
+    what GloomObject.__init__ used to do.
+
+    PYTHONPATH=. python benchmarks/bench_object_memory.py [objects]
+"""
+
+import gc
+import sys
+import tracemalloc
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+class EagerObject(GloomObject):
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.methods
+        self.names
+        # its own hub, which also holds it
+        GloomHub().store(self.location, self)
+
+
+def allocate(cls, objects):
+    heap = GloomHub()
+    for location in range(objects):
+        cls(location=location, heap=heap)
+    return heap
+
+
+def measure_memory(cls, objects):
+    tracemalloc.start()
+    heap = allocate(cls, objects)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def measure_rate(cls, objects):
+    gc.collect()
+    start = perf_counter()
+    heap = allocate(cls, objects)
+    return objects / (perf_counter() - start)
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{objects:,} objects")
+    for label, cls in (("eager", EagerObject), ("lazy", GloomObject)):
+        size = measure_memory(cls, objects)
+        rate = measure_rate(cls, objects)
+        print(f"{label:>6}: {size / objects:8.1f} bytes/object, {size / 2**20:8.1f} MiB, {rate:>10,.0f} objects/s")
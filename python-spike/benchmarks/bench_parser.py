@@ -0,0 +1,30 @@
+""" Parse throughput for programs of :set statements, which all get an implicit
+    Everything receiver. Time per statement should stay flat as programs grow.
+
+    PYTHONPATH=. python benchmarks/bench_parser.py [statements ...]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.parser import Lexer, Parser
+
+
+def generate(statements):
+    return "".join(
+        f":set x :to {i}.\n" for i in range(statements)
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for statements in sizes:
+        tokens = Lexer().lex(generate(statements))
+        start = perf_counter()
+        ast = Parser(tokens).parse_program()
+        elapsed = perf_counter() - start
+        assert len(ast) == statements
+        print(
+            f"{statements:>10,} statements: {elapsed:6.2f}s "
+            f"({statements / elapsed:>10,.0f} statements/s, {elapsed / statements * 1e6:.2f}us each)"
+        )
@@ -0,0 +1,45 @@
+""" Bulk referencing with GloomHub.ref_many and ref_all against a naive loop that looks
+    every object up and bumps it through its public attributes
+
+    PYTHONPATH=. python benchmarks/bench_ref_many.py [objects]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom import clock
+from gloom.columns import ColumnarHub
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def naive(hub, locations):
+    for location in locations:
+        o = hub.get(location)
+        o.references += 1
+        o.last_referenced = clock.now()
+
+
+def time(label, f, *args):
+    start = perf_counter()
+    f(*args)
+    elapsed = perf_counter() - start
+    print(f"{label:>24}: {elapsed:.2f}s")
+    return elapsed
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{objects:,} objects")
+    for hub in (GloomHub(), ColumnarHub()):
+        for location in range(objects):
+            GloomObject(location=location, heap=hub)
+        name = type(hub).__name__
+        baseline = time(f"{name} naive loop", naive, hub, range(objects))
+        for label, f, *args in (
+            ("ref_many", hub.ref_many, range(objects)),
+            ("ref_all", hub.ref_all),
+        ):
+            elapsed = time(f"{name}.{label}", f, *args)
+            print(f"{'':>24}  {baseline / elapsed:.1f}x")
+        assert hub.global_references == 3 * objects
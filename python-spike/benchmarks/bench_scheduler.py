@@ -0,0 +1,95 @@
+""" Thousands of GloomObjects as actors on one event loop: messages per second through a
+    Scheduler with plain and coroutine methods, against delivering the same messages
+    with GloomObject.send, and how long everything takes when a few methods are slow
+
+    PYTHONPATH=. python benchmarks/bench_scheduler.py [actors] [messages per actor]
+"""
+
+import asyncio
+import sys
+import time as clock
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.scheduler import Scheduler
+
+
+SLOW = 0.01
+
+
+def n(self, n):
+    return n
+
+
+async def async_n(self, n):
+    return n
+
+
+def slow_n(self, n):
+    if n == 0:
+        clock.sleep(SLOW)
+    return n
+
+
+async def async_slow_n(self, n):
+    if n == 0:
+        await asyncio.sleep(SLOW)
+    return n
+
+
+def actors(count, method, slow=None):
+    """ count objects, every hundredth with slow instead of method """
+    heap = GloomHub()
+    return [
+        GloomObject(heap=heap, methods={"n": slow if slow is not None and i % 100 == 0 else method})
+        for i in range(count)
+    ]
+
+
+def synchronous(objects, per_actor):
+    for i in range(per_actor):
+        message = {"n": i}
+        for o in objects:
+            o.send(message)
+
+
+def scheduled(objects, per_actor, quantum, ask=False):
+    """ Queue everything with tell(), or with send() if ask, and wait until it's all handled """
+    async def main():
+        scheduler = Scheduler(quantum)
+        runner = asyncio.create_task(scheduler.run())
+        deliver = scheduler.send if ask else scheduler.tell
+        for i in range(per_actor):
+            message = {"n": i}
+            for o in objects:
+                deliver(o, message)
+        await scheduler.join()
+        scheduler.stop()
+        await runner
+    asyncio.run(main())
+
+
+def time(label, messages, f):
+    start = perf_counter()
+    f()
+    elapsed = perf_counter() - start
+    print(f"{label:>32}: {elapsed:.2f}s ({messages / elapsed:,.0f} messages/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    per_actor = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    messages = count * per_actor
+    print(f"{count:,} actors, {per_actor} messages each")
+
+    time("send()", messages, lambda: synchronous(actors(count, n), per_actor))
+    for quantum in (1, 16):
+        time(f"scheduler, quantum {quantum}", messages, lambda: scheduled(actors(count, n), per_actor, quantum))
+    time("scheduler, futures for replies", messages, lambda: scheduled(actors(count, n), per_actor, 16, ask=True))
+    time("scheduler, coroutine methods", messages, lambda: scheduled(actors(count, async_n), per_actor, 16))
+
+    print(f"every hundredth actor takes {SLOW * 1000:.0f}ms over its first message")
+    time("send(), blocking", messages, lambda: synchronous(actors(count, n, slow_n), per_actor))
+    time("scheduler, awaiting", messages, lambda: scheduled(actors(count, n, async_slow_n), per_actor, 16))
@@ -0,0 +1,71 @@
+""" Sending a message that's only defined at the end of a prototype chain: walking the
+    chain's method tables on every send against the (shape, selector) method cache,
+    for chains 1, 4 and 16 prototypes deep
+
+    PYTHONPATH=. python benchmarks/bench_shapes.py [sends]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.dispatch import CallSite
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def size(self):
+    return 1
+
+
+def walk(o, selector):
+    """ Delegation without shapes: every table up the chain, on every send """
+    while o is not None:
+        if (methods := o._methods) is not None and (m := methods.get(selector)) is not None:
+            return m(o)
+        o = o._prototype
+
+
+def chain(depth, heap):
+    """ A clone depth prototypes below the object defining size, each with a table of its own """
+    o = GloomObject(heap=heap, methods={"size": size})
+    for i in range(depth):
+        o = o.clone_to(None)
+        o.methods[f"level{i}"] = size
+    return o
+
+
+def time(label, sends, f):
+    start = perf_counter()
+    f()
+    elapsed = perf_counter() - start
+    print(f"{label:>24}: {elapsed:.2f}s ({sends / elapsed:,.0f} sends/s)")
+    return elapsed
+
+
+if __name__ == "__main__":
+    sends = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    heap = GloomHub()
+    site = CallSite("size")
+    rounds = range(sends)
+
+    for depth in (1, 4, 16):
+        o = chain(depth, heap)
+        assert walk(o, "size") == o.send("size") == o.perform(site) == 1
+        print(f"{sends:,} sends, size defined {depth} prototypes up")
+
+        def walked():
+            for _ in rounds:
+                walk(o, "size")
+
+        def cached():
+            for _ in rounds:
+                o.handle_unary_message("size")
+
+        def performed():
+            for _ in rounds:
+                o.perform(site)
+
+        baseline = time("chain walk", sends, walked)
+        for label, f in (("shape cache", cached), ("perform(site)", performed)):
+            elapsed = time(label, sends, f)
+            print(f"{'':>24}  {baseline / elapsed:.2f}x")
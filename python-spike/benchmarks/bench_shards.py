@@ -0,0 +1,68 @@
+""" A message-heavy workload spread over 1 to N worker processes with a ShardedRuntime,
+    against running it all in this process. Every message does a little arithmetic,
+    as a stand-in for a method with some real work in it.
+
+    PYTHONPATH=. python benchmarks/bench_shards.py [messages] [max workers]
+"""
+
+import os
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.shards import ShardedRuntime
+
+
+OBJECTS = 1024
+BATCH = 4096
+
+
+def work(self, work):
+    total = 0
+    for i in range(work):
+        total += i * i
+    return total
+
+
+def messages(count):
+    return [(i % OBJECTS, {"work": 200}) for i in range(count)]
+
+
+def local(sends):
+    heap = GloomHub()
+    for location in range(OBJECTS):
+        GloomObject(location=location, heap=heap, methods={"work": work})
+    for location, message in sends:
+        heap[location].send(message)
+
+
+def sharded(sends, workers):
+    with ShardedRuntime(workers) as runtime:
+        for location in range(OBJECTS):
+            runtime.create(location, methods={"work": work})
+        start = perf_counter()
+        for i in range(0, len(sends), BATCH):
+            runtime.send_many(sends[i:i + BATCH])
+        return perf_counter() - start
+
+
+def report(label, count, elapsed, baseline=None):
+    speedup = "" if baseline is None else f"  {baseline / elapsed:.2f}x"
+    print(f"{label:>24}: {elapsed:.2f}s ({count / elapsed:,.0f} messages/s){speedup}")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    sends = messages(count)
+    print(f"{count:,} messages to {OBJECTS:,} objects, {os.cpu_count()} cores")
+
+    start = perf_counter()
+    local(sends)
+    baseline = perf_counter() - start
+    report("this process", count, baseline)
+
+    # powers of two up to most, and most itself
+    for workers in sorted({min(2 ** i, most) for i in range(most.bit_length() + 1)}):
+        report(f"{workers} workers", count, sharded(sends, workers), baseline)
@@ -0,0 +1,58 @@
+""" free_all on a large hub, popping every key the way it used to against swapping in
+    a fresh store, then an incremental sweep of the same heap: total time, and the
+    longest any single step kept the interpreter waiting
+
+    PYTHONPATH=. python benchmarks/bench_sweep.py [objects]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.sweep import Sweeper
+
+
+def fill(objects):
+    hub = GloomHub()
+    for location in range(objects):
+        GloomObject(location=location, heap=hub)
+    return hub
+
+
+def pop_all(hub):
+    for key in list(hub.objects.keys()):
+        hub.pop(key, None)
+
+
+def time(label, f, *args):
+    start = perf_counter()
+    f(*args)
+    elapsed = perf_counter() - start
+    print(f"{label:>20}: {elapsed * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"{objects:,} objects")
+    time("free_all, pop loop", pop_all, fill(objects))
+    time("free_all", fill(objects).free_all)
+
+    hub = fill(objects)
+    # reference every other object so half the heap survives
+    hub.ref_many(range(0, objects, 2))
+    sweeper = Sweeper(hub, max_age=0, budget=0.001)
+    steps = 0
+    longest = 0
+    start = perf_counter()
+    done = False
+    while not done:
+        step = perf_counter()
+        done = sweeper.step()
+        longest = max(longest, perf_counter() - step)
+        steps += 1
+    elapsed = perf_counter() - start
+    print(
+        f"{'sweep, 1ms slices':>20}: {elapsed * 1000:9.2f}ms in {steps:,} steps, "
+        f"longest {longest * 1000:.2f}ms, freed {sweeper.freed:,}"
+    )
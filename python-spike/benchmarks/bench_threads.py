@@ -0,0 +1,52 @@
+""" Several threads referencing the same objects at once: a plain GloomHub, a
+    ConcurrentHub with a single stripe (one lock for everything) and one with 64. Prints
+    references per second and how many references went missing along the way.
+
+    PYTHONPATH=. python benchmarks/bench_threads.py [references per thread] [max threads]
+"""
+
+import sys
+from threading import Thread
+from time import perf_counter
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.threadsafe import ConcurrentHub
+
+
+OBJECTS = 1024
+
+
+def contend(hub, threads, per_thread):
+    objects = [GloomObject(heap=hub) for _ in range(OBJECTS)]
+    locations = [o.location for o in objects] * (per_thread // OBJECTS)
+    workers = [Thread(target=hub.ref_many, args=(locations,)) for _ in range(threads)]
+    start = perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = perf_counter() - start
+    expected = threads * len(locations)
+    lost = expected - sum(o.references for o in objects)
+    return elapsed, expected, lost
+
+
+if __name__ == "__main__":
+    per_thread = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{per_thread:,} references per thread over {OBJECTS:,} objects, GIL {'on' if gil else 'off'}")
+
+    hubs = (
+        ("GloomHub", GloomHub),
+        ("ConcurrentHub, 1 stripe", lambda: ConcurrentHub(stripes=1)),
+        ("ConcurrentHub, 64 stripes", lambda: ConcurrentHub(stripes=64)),
+    )
+    threads = 1
+    while threads <= most:
+        print(f"{threads} threads")
+        for label, hub in hubs:
+            elapsed, expected, lost = contend(hub(), threads, per_thread)
+            print(f"{label:>28}: {elapsed:.2f}s ({expected / elapsed:,.0f} references/s), {lost:,} lost")
+        threads *= 2
@@ -0,0 +1,69 @@
+""" The sample program from gloom/parser.py run in a loop, walking the tree against
+    compiling it once and running the bytecode
+
+    PYTHONPATH=. python benchmarks/bench_vm.py [iterations]
+"""
+
+import sys
+from time import perf_counter
+
+from gloom.compiler import VM, compile_program
+from gloom.gloom import GloomObject
+from gloom.parser import ObjectNode, Parser
+
+
+PROGRAM = """
+    :listen.
+    ((1 + 2) * 3) :print.
+    :set x :to 5.
+    :set y :to x :at 6.0.
+    y :print.
+
+    :set x :to #(1 2 3 #(4.0 5)).
+    :set y :to (x :at 2).
+    y :print.
+
+    1 :times 5.
+    """
+
+
+def walk(statements, environment, iterations):
+    for _ in range(iterations):
+        for statement in statements:
+            statement.evaluate(environment)
+
+
+def run(bytecode, environment, iterations):
+    vm = VM()
+    for _ in range(iterations):
+        vm.run(bytecode, environment)
+
+
+def compare(label, statements, bytecode, environment, iterations):
+    start = perf_counter()
+    walk(statements, environment, iterations)
+    walked = perf_counter() - start
+
+    start = perf_counter()
+    run(bytecode, environment, iterations)
+    ran = perf_counter() - start
+
+    print(label)
+    print(f"{'tree walk':>12}: {walked:.2f}s ({iterations / walked:,.0f} runs/s)")
+    print(f"{'vm':>12}: {ran:.2f}s ({iterations / ran:,.0f} runs/s)")
+    print(f"{'speedup':>12}: {walked / ran:.2f}x")
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    statements = Parser().parse(PROGRAM)
+    bytecode = compile_program(statements)
+    environment = GloomObject()
+
+    print(f"{iterations:,} runs, {len(bytecode)} instructions each")
+    compare("with ObjectNode.send", statements, bytecode, environment, iterations)
+
+    # Both sides spend most of their time inside ObjectNode.send, so also time them
+    # with a send that does nothing to compare just the evaluation machinery
+    ObjectNode.send = lambda self, payload, environment: self
+    compare("evaluation only", statements, bytecode, environment, iterations)
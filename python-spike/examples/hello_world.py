@@ -1,7 +1,7 @@
 """ Kinda sorta hello-world in Gloom
 """
 
-from gloom.gloom import GloomObject, GloomPointer, GloomEverything, GloomSomething
+from gloom.gloom import GloomObject, GloomPointer, GloomEverything, GloomSomething, use_everything
 
 everything = GloomObject(
     name="everything",
@@ -36,6 +36,8 @@ everything.methods["new:location"] = new
 everything.methods["+:to"] = add
 everything.methods["add:to"] = add
 everything.methods["dereference"] = dereference
+# every other object delegates what it doesn't define itself to everything
+use_everything(everything)
 
 
 if __name__ == "__main__":
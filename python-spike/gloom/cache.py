@@ -0,0 +1,112 @@
+""" Parse cache: programs that have been parsed before skip the Lexer and Parser entirely.
+
+    Parsed programs are kept as ASTArenas in an in-process LRU keyed by a hash of the
+    program text, and optionally written to a cache directory (think .pyc for Gloom) so
+    a fresh process can pick them up too. Since entries are keyed by content, editing a
+    script simply misses the cache.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from gloom.parser import ASTArena, Lexer, Parser
+
+
+# Bump the version byte whenever ASTArena.dumps changes shape -- older files then miss.
+MAGIC = b"GLOOM\x00\x01"
+SUFFIX = ".gloomc"
+
+
+class ParseCache:
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+
+    def __len__(self):
+        return len(self.entries)
+
+
+    def __repr__(self):
+        return f"ParseCache(hits={self.hits}, disk_hits={self.disk_hits}, misses={self.misses}, size={len(self)})"
+
+
+    @staticmethod
+    def key(program):
+        return hashlib.blake2b(program.encode(), digest_size=16).hexdigest()
+
+
+    def arena(self, program):
+        key = self.key(program)
+        if (arena := self.entries.get(key)) is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return arena
+
+        if (arena := self.load(key)) is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            arena = Parser(Lexer().lex(program)).parse_program(arena=True)
+            self.save(key, arena)
+
+        self.entries[key] = arena
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return arena
+
+
+    def parse(self, program):
+        """ Same result as Parser().parse(program). Evaluating a tree mutates it, so every
+            call materializes fresh nodes from the cached arena.
+        """
+        return self.arena(program).materialize()
+
+
+    def parse_file(self, path):
+        with open(path, encoding="utf-8") as f:
+            return self.parse(f.read())
+
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+
+    def load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        header = MAGIC + bytes.fromhex(key)
+        if not data.startswith(header):
+            return None
+        try:
+            return ASTArena.loads(data[len(header):])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+
+    def save(self, key, arena):
+        if self.directory is None:
+            return
+        path = self.path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(MAGIC + bytes.fromhex(key) + arena.dumps())
+        os.replace(temporary, path)
+
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.disk_hits = self.misses = 0
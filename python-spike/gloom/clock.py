@@ -0,0 +1,64 @@
+""" Timestamps for GloomObjects.
+
+    Objects are stamped on creation and on every @ref, which is far too often to pay for
+    datetime.now(). Stamps are plain ints from the current clock instead, and only turn
+    into something human readable when safe_repr shows them.
+
+    MonotonicClock (the default) counts nanoseconds with time.monotonic_ns and converts
+    them to datetimes using the offset from the wall clock it read when it was created.
+    TickClock is a logical clock where every stamp is one more than the last, which is
+    cheaper still and reproducible across runs, but has no wall time to convert to.
+
+    Pick the clock with use() before creating objects: stamps from different clocks
+    don't compare.
+"""
+
+import time
+from datetime import datetime
+from itertools import count
+
+
+class MonotonicClock:
+
+    def __init__(self):
+        # wall time minus monotonic time, in nanoseconds, read once
+        self.offset = time.time_ns() - time.monotonic_ns()
+        self.now = time.monotonic_ns
+
+
+    def __repr__(self):
+        return f"MonotonicClock(offset={self.offset})"
+
+
+    def display(self, stamp):
+        return datetime.fromtimestamp((stamp + self.offset) / 1e9)
+
+
+class TickClock:
+
+    def __init__(self, start=0):
+        self.ticks = count(start + 1)
+        self.now = self.ticks.__next__
+
+
+    def __repr__(self):
+        return "TickClock()"
+
+
+    def display(self, stamp):
+        return f"tick {stamp}"
+
+
+current = MonotonicClock()
+now = current.now
+display = current.display
+
+
+def use(clock):
+    """ Stamp everything from here on with clock, returns the clock it replaced """
+    global current, now, display
+    previous = current
+    current = clock
+    now = clock.now
+    display = clock.display
+    return previous
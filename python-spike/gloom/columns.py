@@ -0,0 +1,169 @@
+""" An optional columnar heap for GloomObjects.
+
+    ColumnarHub keeps the reference count, affinity and last referenced stamp of every
+    GloomObject living in it (created with heap=ColumnarHub()) in flat arrays, one
+    element per slot. Those objects become thin views: reading or bumping references
+    goes to the hub's columns instead of the object. Bulk operations then work on whole
+    columns at once -- ref_all() is a single pass over an array rather than a loop over
+    objects -- and snapshot() is a few array copies.
+
+    Objects merely stored in the hub, or moved out of their heap, keep their fields on
+    themselves as usual. Free slots always hold zero references, so summing the
+    references column gives the total for everything in the columns.
+"""
+
+from array import array
+from functools import partial
+from itertools import repeat
+from operator import add
+
+from gloom import clock
+from gloom.gloom import AFFINITIES
+from gloom.hub import GloomHub
+
+
+AFFINITY_CODES = {affinity: code for code, affinity in enumerate(AFFINITIES)}
+FREE = 255
+
+
+class ColumnSnapshot:
+
+    __slots__ = ("references", "affinities", "referenced", "size")
+
+    def __init__(self, references, affinities, referenced, size):
+        self.references = references
+        self.affinities = affinities
+        self.referenced = referenced
+        self.size = size
+
+
+    def __repr__(self):
+        return f"ColumnSnapshot(size={self.size}, total_references={self.total_references})"
+
+
+    @property
+    def total_references(self):
+        return sum(self.references)
+
+
+    def count(self, affinity):
+        return self.affinities.count(AFFINITY_CODES[affinity])
+
+
+class ColumnarHub(GloomHub):
+
+    def __init__(self):
+        super().__init__()
+        self.reference_counts = array("q")
+        self.affinities = array("B")
+        self.referenced = array("q")
+        self.free_slots = []
+        # objects living in the columns
+        self.members = 0
+        # members also held by other hubs (or under several keys here), which ref_all
+        # has to tell about it
+        self.shared = set()
+        # everything else stored here that keeps references: id -> [object, keys]
+        self.guests = {}
+
+
+    def allocate_slot(self, o):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.reference_counts[slot] = o._references
+            self.affinities[slot] = AFFINITY_CODES[o._affinity]
+            self.referenced[slot] = o.last_referenced
+        else:
+            slot = len(self.reference_counts)
+            self.reference_counts.append(o._references)
+            self.affinities.append(AFFINITY_CODES[o._affinity])
+            self.referenced.append(o.last_referenced)
+        o._slot = slot
+        self.members += 1
+        self.rehomed(o)
+
+
+    def release_slot(self, o):
+        """ Hand the object its fields back and free its slot """
+        slot = o._slot
+        o._slot = None
+        o._references = self.reference_counts[slot]
+        o._affinity = AFFINITIES[self.affinities[slot]]
+        o._last_referenced = self.referenced[slot]
+        self.reference_counts[slot] = 0
+        self.affinities[slot] = FREE
+        self.free_slots.append(slot)
+        self.members -= 1
+        self.shared.discard(o)
+
+
+    def rehomed(self, o):
+        """ Called by a member whenever the hubs holding it change """
+        if o.tallies == (self.tally,):
+            self.shared.discard(o)
+        else:
+            self.shared.add(o)
+
+
+    def attach(self, value):
+        super().attach(value)
+        if getattr(value, "_heap", None) is self:
+            if value._slot is None:
+                self.allocate_slot(value)
+        elif hasattr(value, "tallies"):
+            if (guest := self.guests.get(id(value))) is None:
+                self.guests[id(value)] = [value, 1]
+            else:
+                guest[1] += 1
+
+
+    def detach(self, value):
+        super().detach(value)
+        if getattr(value, "_heap", None) is self:
+            if value._slot is not None and self.tally not in value.tallies:
+                self.release_slot(value)
+        elif (guest := self.guests.get(id(value))) is not None:
+            guest[1] -= 1
+            if not guest[1]:
+                del self.guests[id(value)]
+
+
+    def ref_all(self):
+        """ Reference every object in the hub once. Members are done a column at a time,
+            then only the few objects with other hubs to tell are visited one by one.
+        """
+        if self.members:
+            self.reference_counts[:] = array("q", map(partial(add, 1), self.reference_counts))
+            for slot in self.free_slots:
+                self.reference_counts[slot] = 0
+            self.referenced[:] = array("q", repeat(clock.now(), len(self.referenced)))
+            self.total_references += self.members
+        for o in self.shared:
+            tallies = list(o.tallies)
+            tallies.remove(self.tally)
+            for tally in tallies:
+                tally.total_references += 1
+        for o, _ in list(self.guests.values()):
+            o.references += 1
+
+
+    def free_all(self):
+        """ Members need their fields handed back, so unlike GloomHub.free_all this
+            visits every object
+        """
+        for key in list(self.objects):
+            self.pop(key, None)
+        super().free_all()
+        self.reference_counts = array("q")
+        self.affinities = array("B")
+        self.referenced = array("q")
+        self.free_slots = []
+
+
+    def snapshot(self):
+        return ColumnSnapshot(
+            array("q", self.reference_counts),
+            array("B", self.affinities),
+            array("q", self.referenced),
+            self.members,
+        )
@@ -0,0 +1,287 @@
+""" Compiles parsed programs to flat bytecode and runs it on a small stack machine.
+
+    Instead of walking MessageSendNodes recursively, each statement becomes a run of
+    (opcode, operand) pairs: push the receiver, push every argument, then one SEND that
+    pops them all. The VM runs those pairs in a single dispatch loop, using the
+    environment object's stack as the operand stack.
+
+    Anything fixed at compile time is built once when the bytecode is linked: literal
+    objects (arrays included), name objects, and the whole payload of a send whose
+    arguments are all literals or unary, which then needs a single SEND_CONST. Keywords
+    are interned as they're compiled, so payload lookups compare them by identity.
+
+    Linking also gives every distinct selector a dispatch.CallSite. Sends to a
+    GloomObject go through it, so the method a selector resolves to is remembered from
+    one run of the bytecode to the next instead of looked up on every send.
+"""
+
+import sys
+from array import array
+from enum import IntEnum
+
+from gloom.dispatch import CallSite
+from gloom.parser import MessageSendNode, ObjectNode
+
+
+class Opcode(IntEnum):
+    PUSH_CONST = 0      # the object for constants[operand], for arguments and array items
+    COPY_CONST = 1      # a fresh object from constants[operand], for receivers (sends mutate them)
+    PUSH_NAME = 2       # the object for names[operand], for receivers and array items
+    LOAD_NAME = 3       # value of names[operand] in the environment's names, for arguments
+    PUSH_UNARY = 4      # what a unary argument evaluates to
+    BUILD_ARRAY = 5     # pop operand items into an array object
+    SEND = 6            # pop len(selectors[operand]) arguments and a receiver, push the reply
+    SEND_CONST = 7      # pop a receiver, send it the prebuilt payloads[operand], push the reply
+    POP = 8             # end of statement
+
+
+# Plain ints for the dispatch loop, comparing against IntEnum members is slower
+(
+    PUSH_CONST, COPY_CONST, PUSH_NAME, LOAD_NAME, PUSH_UNARY, BUILD_ARRAY, SEND, SEND_CONST, POP
+) = map(int, Opcode)
+
+
+def build_constant(constant):
+    """ A fresh ObjectNode for a (value, kind) constant. Array values are tuples of constants. """
+    value, kind = constant
+    if kind == "array":
+        return ObjectNode([build_constant(item) for item in value], kind)
+    return ObjectNode(value, kind)
+
+
+class Bytecode:
+
+    __slots__ = (
+        "code", "constants", "names", "selectors", "payloads",
+        "constant_nodes", "name_nodes", "payload_dicts", "sites", "payload_sites",
+    )
+
+    def __init__(self):
+        self.code = array("i")
+        self.constants = []
+        self.names = []
+        self.selectors = []
+        self.payloads = []
+        self.constant_nodes = []
+        self.name_nodes = []
+        self.payload_dicts = []
+        self.sites = []
+        self.payload_sites = []
+
+
+    def __len__(self):
+        return len(self.code) // 2
+
+
+    def emit(self, opcode, operand=0):
+        self.code.append(opcode)
+        self.code.append(operand)
+
+
+    def link(self):
+        """ Build the objects PUSH_CONST, PUSH_NAME and SEND_CONST hand out, once, instead of per run """
+        self.constant_nodes = [build_constant(constant) for constant in self.constants]
+        self.name_nodes = [ObjectNode(name, "object") for name in self.names]
+        self.payload_dicts = [
+            {
+                keyword: [] if constant is None else self.constant_nodes[constant]
+                for keyword, constant in payload
+            }
+            for payload in self.payloads
+        ]
+        self.sites = [CallSite(selector) for selector in self.selectors]
+        self.payload_sites = [
+            CallSite(tuple(keyword for keyword, _ in payload)) for payload in self.payloads
+        ]
+
+
+    def disassemble(self):
+        lines = []
+        for i in range(0, len(self.code), 2):
+            opcode, operand = Opcode(self.code[i]), self.code[i + 1]
+            match opcode:
+                case Opcode.PUSH_CONST | Opcode.COPY_CONST:
+                    detail = self.constants[operand]
+                case Opcode.PUSH_NAME | Opcode.LOAD_NAME:
+                    detail = self.names[operand]
+                case Opcode.SEND:
+                    detail = ":".join(self.selectors[operand])
+                case Opcode.SEND_CONST:
+                    detail = self.payload_dicts[operand]
+                case _:
+                    detail = ""
+            lines.append(f"{i // 2:>4} {opcode.name:<12} {operand:>4} {detail}".rstrip())
+        return "\n".join(lines)
+
+
+class Compiler:
+
+    def __init__(self):
+        self.bytecode = Bytecode()
+        self.constant_ids = {}
+        self.name_ids = {}
+        self.selector_ids = {}
+        self.payload_ids = {}
+
+
+    def compile(self, statements):
+        for statement in statements:
+            self.compile_send(statement)
+            self.bytecode.emit(Opcode.POP)
+        self.bytecode.link()
+        return self.bytecode
+
+
+    def intern(self, table, ids, key):
+        if (index := ids.get(key)) is None:
+            index = ids[key] = len(table)
+            table.append(key)
+        return index
+
+
+    def constant(self, node):
+        """ The (value, kind) constant for a literal node, or None if node isn't one """
+        if isinstance(node, MessageSendNode) or node.kind == "object":
+            return None
+        if node.kind == "array":
+            items = tuple(self.constant_or_name(item) for item in node.value)
+            return None if None in items else (items, "array")
+        return (node.value, node.kind)
+
+
+    def constant_or_name(self, node):
+        """ Array items keep names as name objects, so they are constants there too """
+        if isinstance(node, ObjectNode) and node.kind == "object":
+            return (node.value, node.kind)
+        return self.constant(node)
+
+
+    def payload(self, arguments):
+        """ ((keyword, constant id or None for unary), ...) if every argument is fixed, else None """
+        payload = []
+        for argument in arguments:
+            if isinstance(argument.value, list):
+                payload.append((sys.intern(argument.selector), None))
+            elif (constant := self.constant(argument.value)) is not None:
+                payload.append((
+                    sys.intern(argument.selector),
+                    self.intern(self.bytecode.constants, self.constant_ids, constant)
+                ))
+            else:
+                return None
+        return tuple(payload)
+
+
+    def compile_send(self, node):
+        self.compile_object(node.receiver, Opcode.COPY_CONST)
+        if (payload := self.payload(node.arguments)) is not None:
+            self.bytecode.emit(
+                Opcode.SEND_CONST,
+                self.intern(self.bytecode.payloads, self.payload_ids, payload)
+            )
+            return
+        for argument in node.arguments:
+            self.compile_argument(argument)
+        selector = tuple(sys.intern(argument.selector) for argument in node.arguments)
+        self.bytecode.emit(
+            Opcode.SEND,
+            self.intern(self.bytecode.selectors, self.selector_ids, selector)
+        )
+
+
+    def compile_argument(self, argument):
+        value = argument.value
+        if isinstance(value, list):
+            self.bytecode.emit(Opcode.PUSH_UNARY)
+        elif isinstance(value, ObjectNode) and value.kind == "object":
+            self.bytecode.emit(
+                Opcode.LOAD_NAME,
+                self.intern(self.bytecode.names, self.name_ids, value.value)
+            )
+        else:
+            self.compile_object(value)
+
+
+    def compile_object(self, node, literal=Opcode.PUSH_CONST):
+        """ An object used as itself: a receiver, a literal argument or an array item """
+        if isinstance(node, MessageSendNode):
+            self.compile_send(node)
+        elif node.kind == "object":
+            self.bytecode.emit(
+                Opcode.PUSH_NAME,
+                self.intern(self.bytecode.names, self.name_ids, node.value)
+            )
+        elif (constant := self.constant(node)) is not None:
+            self.bytecode.emit(
+                literal,
+                self.intern(self.bytecode.constants, self.constant_ids, constant)
+            )
+        else:
+            for item in node.value:
+                self.compile_object(item)
+            self.bytecode.emit(Opcode.BUILD_ARRAY, len(node.value))
+
+
+def compile_program(statements):
+    return Compiler().compile(statements)
+
+
+class VM:
+
+    def run(self, bytecode, environment):
+        """ Execute bytecode against environment (a GloomObject), returning the value of the
+            last statement. Operands live on environment.stack, which is left as it was found.
+        """
+        stack = environment.stack
+        push = stack.append
+        pop = stack.pop
+        constants = bytecode.constants
+        constant_nodes = bytecode.constant_nodes
+        names = bytecode.names
+        name_nodes = bytecode.name_nodes
+        selectors = bytecode.selectors
+        payload_dicts = bytecode.payload_dicts
+        sites = bytecode.sites
+        payload_sites = bytecode.payload_sites
+        lookup = environment.names.get
+        fromkeys = dict.fromkeys
+
+        result = None
+        instructions = iter(bytecode.code)
+        for opcode, operand in zip(instructions, instructions):
+            if opcode == SEND_CONST:
+                receiver = pop()
+                if type(receiver) is ObjectNode:
+                    push(receiver.send(payload_dicts[operand], environment))
+                else:
+                    push(receiver.send(payload_dicts[operand], payload_sites[operand]))
+            elif opcode == PUSH_NAME:
+                push(name_nodes[operand])
+            elif opcode == POP:
+                result = pop()
+            elif opcode == PUSH_CONST:
+                push(constant_nodes[operand])
+            elif opcode == COPY_CONST:
+                push(build_constant(constants[operand]))
+            elif opcode == LOAD_NAME:
+                push(lookup(names[operand], 0))
+            elif opcode == SEND:
+                # arguments come off the stack last first, fromkeys keeps the payload in order
+                keywords = selectors[operand]
+                payload = fromkeys(keywords)
+                for keyword in reversed(keywords):
+                    payload[keyword] = pop()
+                receiver = pop()
+                if type(receiver) is ObjectNode:
+                    push(receiver.send(payload, environment))
+                else:
+                    push(receiver.send(payload, sites[operand]))
+            elif opcode == PUSH_UNARY:
+                push([])
+            elif opcode == BUILD_ARRAY:
+                items = stack[len(stack) - operand:]
+                del stack[len(stack) - operand:]
+                push(ObjectNode(items, "array"))
+            else:
+                raise RuntimeError(f"no idea what opcode {opcode} is")
+        return result
@@ -0,0 +1,237 @@
+""" Selector interning, shapes and method caches for GloomObject method dispatch.
+
+    A selector is the string a method is registered under in an object's methods, like
+    "new:location" for a keyword message {"new": ..., "location": ...}. Selectors are
+    built and interned once per distinct message shape instead of joined on every send.
+
+    Methods resolve by delegation: an object's own MethodTable, then its prototype's,
+    and so on up the chain, ending at GloomObject.everything. Rather than walk that
+    chain on every send, every object has a Shape -- its own table (if it has one) on
+    top of its prototype's Shape -- and objects with the same table and prototype share
+    one. Each Shape caches what selectors resolved to through it, so together the
+    shapes' caches are one method cache keyed by (shape, selector).
+
+    When a MethodTable changes, only its own shapes and the shapes built on top of them
+    are retired. Objects notice their shape was retired the next time they look
+    something up and build a fresh one, so everything else keeps its cache. Changing
+    where every chain ends (GloomObject.everything) retires every shape at once by
+    moving the global epoch on. Code that sends the same message from the same place
+    over and over can also keep a CallSite there, which remembers what its selector
+    resolved to for the last few shapes it saw.
+"""
+
+import sys
+
+
+# Shapes made before the last invalidate() are retired
+epoch = 0
+
+
+def invalidate():
+    """ Retire every shape, for changes that could make anything resolve differently """
+    global epoch
+    epoch += 1
+
+
+class MethodTable(dict):
+
+    __slots__ = ("version", "shapes")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        # Shape by parent shape, for every chain this table sits on top of
+        self.shapes = None
+
+
+    def __reduce__(self):
+        # just the methods: pickle would otherwise restore them through __setitem__
+        # before the slots exist, and shapes are rebuilt on the other side anyway
+        return MethodTable, (dict(self),)
+
+
+    def changed(self):
+        """ Retire the shapes this table is part of, they may resolve differently now """
+        self.version += 1
+        if (shapes := self.shapes) is not None:
+            self.shapes = None
+            for shape in shapes.values():
+                shape.retire()
+
+
+    def __setitem__(self, selector, method):
+        super().__setitem__(selector, method)
+        self.changed()
+
+
+    def __delitem__(self, selector):
+        super().__delitem__(selector)
+        self.changed()
+
+
+    def pop(self, *args):
+        self.changed()
+        return super().pop(*args)
+
+
+    def popitem(self):
+        self.changed()
+        return super().popitem()
+
+
+    def clear(self):
+        super().clear()
+        self.changed()
+
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.changed()
+
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self.changed()
+        return self
+
+
+    def setdefault(self, selector, default=None):
+        if selector in self:
+            return self[selector]
+        super().__setitem__(selector, default)
+        self.changed()
+        return default
+
+
+    def shape(self, parent):
+        """ The Shape for this table on top of parent (a Shape or None) """
+        if (shapes := self.shapes) is None:
+            shapes = self.shapes = {}
+        if (shape := shapes.get(parent)) is None or shape.epoch != epoch:
+            shape = shapes[parent] = Shape(self, parent)
+        return shape
+
+
+class Shape:
+
+    __slots__ = ("table", "parent", "epoch", "methods", "children")
+
+    # the epoch of a shape that's been retired
+    RETIRED = -1
+
+    def __init__(self, table, parent):
+        self.table = table
+        self.parent = parent
+        # current while it equals the module's epoch
+        self.epoch = epoch
+        # method (or None) by selector
+        self.methods = {}
+        # shapes built on top of this one, retired along with it
+        self.children = None
+        if parent is not None:
+            if parent.children is None:
+                parent.children = set()
+            parent.children.add(self)
+
+
+    def __repr__(self):
+        depth = 0
+        shape = self
+        while (shape := shape.parent) is not None:
+            depth += 1
+        return f"Shape({len(self.table)} methods, {depth} above)"
+
+
+    def retire(self):
+        """ Stop this shape and every shape on top of it from being used again """
+        if self.epoch == Shape.RETIRED:
+            return
+        self.epoch = Shape.RETIRED
+        if (parent := self.parent) is not None and parent.children is not None:
+            parent.children.discard(self)
+        if (shapes := self.table.shapes) is not None and shapes.get(self.parent) is self:
+            del shapes[self.parent]
+        if (children := self.children) is not None:
+            self.children = None
+            for child in children:
+                child.retire()
+
+
+    def lookup(self, selector):
+        """ The method selector resolves to through this shape, or None """
+        try:
+            return self.methods[selector]
+        except KeyError:
+            pass
+        shape = self
+        method = None
+        while shape is not None:
+            if (method := shape.table.get(selector)) is not None:
+                break
+            shape = shape.parent
+        self.methods[selector] = method
+        return method
+
+
+_selectors = {}
+_binary_selectors = {}
+
+
+def intern_selector(keywords):
+    """ ("new", "location") -> "new:location", built and interned once per keyword tuple """
+    if (selector := _selectors.get(keywords)) is None:
+        selector = _selectors[keywords] = sys.intern(":".join(keywords))
+    return selector
+
+
+def binary_selector(operator):
+    """ Binary messages are looked up as "<operator>:to", e.g. "+:to" """
+    if (selector := _binary_selectors.get(operator)) is None:
+        selector = _binary_selectors[operator] = intern_selector((operator, "to"))
+    return selector
+
+
+class CallSite:
+
+    __slots__ = ("selector", "shape", "method", "others")
+
+    # how many shapes a site remembers before it starts forgetting the oldest
+    POLYMORPHIC_LIMIT = 4
+
+    def __init__(self, keywords):
+        """ keywords is a unary selector string or a tuple of keywords """
+        if isinstance(keywords, str):
+            keywords = (keywords,)
+        self.selector = intern_selector(keywords)
+        self.shape = None
+        self.method = None
+        self.others = ()
+
+
+    def __repr__(self):
+        return f"CallSite({self.selector!r})"
+
+
+    def lookup(self, shape):
+        """ The method this selector resolves to through shape (a current Shape, or None),
+            or None. Shapes are retired rather than changed, so a shape seen before
+            always resolves to the same method.
+        """
+        if shape is self.shape:
+            return self.method
+        for other, method in self.others:
+            if other is shape:
+                return method
+        return self.miss(shape)
+
+
+    def miss(self, shape):
+        method = None if shape is None else shape.lookup(self.selector)
+        # forget whatever has been retired since
+        others = [(self.shape, self.method)]
+        others.extend(other for other in self.others if other[0] is not shape)
+        others = [other for other in others if other[0] is not None and other[0].epoch == epoch]
+        self.others = tuple(others[:self.POLYMORPHIC_LIMIT - 1])
+        self.shape = shape
+        self.method = method
+        return method
@@ -1,11 +1,15 @@
 from collections.abc import Iterable
-from datetime import datetime
 from enum import Enum
+from functools import wraps
 
 from types import MethodType as register_method
 from typing import Callable
 
+from gloom import clock, dispatch
+from gloom.dispatch import CallSite, MethodTable, binary_selector, intern_selector
 from gloom.hub import GloomHub
+from gloom.mailbox import Mailbox, MailboxFull
+from gloom.message import GloomMessage
 
 from sys import maxsize as MAXINT
 from sys import float_info
@@ -15,26 +19,31 @@ MAXFLOAT = float_info.max
 
 
 def ref(func):
-    def wrapper(*args, **kwargs):
-        assert len(args) > 0
-        maybe_object = args[0]
-        assert isinstance(maybe_object, GloomObject)
-        maybe_object.references += 1
-        maybe_object.last_referenced = datetime.now()
-        return func(*args, **kwargs)
+    """ Count a reference to the GloomObject a method is called on """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self.reference(clock.now())
+        return func(self, *args, **kwargs)
     return wrapper
 
 
 
 def refmany(to_reference):
-    to_reference = list(to_reference)
-    for location in to_reference:
-        o = GloomObject.objects.get(location)
-        o.references += 1
+    """ Reference the objects at these locations in the shared heap """
+    GloomObject.objects.ref_many(to_reference)
 
 
 def refall():
-    refmany(GloomObject.objects.objects)
+    GloomObject.objects.ref_all()
+
+
+def use_everything(o):
+    """ Make o the end of every prototype chain, returns the object it replaced """
+    previous, GloomObject.everything = GloomObject.everything, o
+    if o is not None:
+        o.delegated_to()
+    dispatch.invalidate()
+    return previous
 
 
 class GloomAffinity(Enum):
@@ -60,32 +69,173 @@ def default_receiver(self, sender, method_name, *args, **kwargs):
     return identity(*args, **kwargs)
 
 
+class SharedHeap:
+    """ GloomObject.objects: the shared heap when read off the class, the heap an object
+        lives in when read off an instance
+    """
+
+    def __init__(self, heap):
+        self.heap = heap
+
+
+    def __get__(self, o, cls=None):
+        if o is None:
+            return self.heap
+        return o._heap
+
+
+    def __set__(self, o, heap):
+        o._heap = heap
+
+
+def recorded(name):
+    """ A GloomObject attribute that lives in its side record """
+    def get(self):
+        return getattr(self.record, name)
+
+    def set(self, value):
+        setattr(self.record, name, value)
+
+    return property(get, set)
+
+
+class GloomRecord:
+    """ The parts of a GloomObject most objects never touch: mailboxes, names, updated_at
+        and rarely set flags. Allocated the first time one of them is used.
+    """
+
+    __slots__ = ("inbox", "outbox", "stack", "names", "updated_at", "auto_deref")
+
+    def __init__(self, stamp):
+        self.inbox = Mailbox()
+        self.outbox = Mailbox()
+        self.stack = []
+        self.names = None
+        self.updated_at = stamp
+        self.auto_deref = False
+
+
+# Affinity by its index, as the columns of a columns.ColumnarHub store it
+AFFINITIES = tuple(GloomAffinity)
+
+
 class GloomObject:
 
+    __slots__ = (
+        "name", "value", "receiver", "selector", "listening", "created_at", "_tallies",
+        "_references", "_last_referenced", "_affinity", "_methods", "_heap", "_location", "_record", "_slot",
+        "_prototype", "_shape", "_lock", "generation",
+    )
+
+    # The heap every object lives in unless it's given one of its own
+    objects = SharedHeap(GloomHub())
+
+    # Where every prototype chain ends: methods nothing else defines are looked up here
+    everything = None
+
 
-    def __init__(self, name=None, value=None, affinity=None, methods=None, receiver=default_receiver, selector="anonymous", location=None):
+    def __init__(self, name=None, value=None, affinity=None, methods=None, receiver=default_receiver, selector="anonymous", location=None, heap=None):
         self.name = name or "anonymous"
-        self.references = 0
-        self.created_at = datetime.now()
-        self.methods = methods or {}
-        self.objects = GloomHub()
-        self.names = GloomHub()
+        self._references = 0
+        # Index into the heap's columns, if it is a columns.ColumnarHub
+        self._slot = None
+        # Guards the reference count, if a threadsafe.ConcurrentHub holds this object
+        self._lock = None
+        # Sweeps survived, see sweep.Sweeper
+        self.generation = 0
+        self.created_at = self._last_referenced = clock.now()
+        self._methods = None
+        # What this object was cloned from, and delegates methods it doesn't have to
+        self._prototype = None
+        # dispatch.Shape as of the last lookup, used until it's retired
+        self._shape = None
+        if methods is not None:
+            self.methods = methods
+        self._heap = heap if heap is not None else GloomObject.objects
+        self._record = None
+        # Tallies of the hubs holding this object, see GloomHub.attach
+        self._tallies = ()
         self.receiver = receiver
         self.value = value
         if affinity is None:
             self.affinity = GloomAffinity.NOTHING
         else:
             self.affinity = affinity
-        self.updated_at = datetime.now()
-        self.last_referenced = datetime.now()
+        if location is None:
+            location = self._heap.allocate()
         self._location = location
-        self.objects.store(self._location, self)
-        self.inbox = []
-        self.outbox = []
-        self.stack = []
+        self._heap.store(self._location, self)
         self.selector = selector
         self.listening = True
-        self.auto_deref = False
+
+
+    @property
+    def record(self):
+        if (record := self._record) is None:
+            record = self._record = GloomRecord(self.created_at)
+        return record
+
+
+    inbox = recorded("inbox")
+    outbox = recorded("outbox")
+    stack = recorded("stack")
+    auto_deref = recorded("auto_deref")
+
+
+    @property
+    def names(self):
+        record = self.record
+        if record.names is None:
+            record.names = GloomHub()
+        return record.names
+
+
+    @names.setter
+    def names(self, names):
+        self.record.names = names
+
+
+    @property
+    def updated_at(self):
+        if (record := self._record) is None:
+            return self.created_at
+        return record.updated_at
+
+
+    @updated_at.setter
+    def updated_at(self, stamp):
+        self.record.updated_at = stamp
+
+
+    @property
+    def last_referenced(self):
+        if (slot := self._slot) is not None:
+            return self._heap.referenced[slot]
+        return self._last_referenced
+
+
+    @last_referenced.setter
+    def last_referenced(self, stamp):
+        if (slot := self._slot) is not None:
+            self._heap.referenced[slot] = stamp
+        else:
+            self._last_referenced = stamp
+
+
+    @property
+    def affinity(self):
+        if (slot := self._slot) is not None:
+            return AFFINITIES[self._heap.affinities[slot]]
+        return self._affinity
+
+
+    @affinity.setter
+    def affinity(self, affinity):
+        if (slot := self._slot) is not None:
+            self._heap.affinities[slot] = AFFINITIES.index(affinity)
+        else:
+            self._affinity = affinity
+
 
     @property
     def is_nothing(self):
@@ -105,44 +255,266 @@ class GloomObject:
         return self.affinity == GloomAffinity.REFERENCE
 
 
+    @property
+    def tallies(self):
+        return self._tallies
+
+
+    @tallies.setter
+    def tallies(self, tallies):
+        self._tallies = tallies
+        if self._slot is not None:
+            self._heap.rehomed(self)
+
+
+    def reference(self, stamp):
+        """ One more reference, as of stamp. What @ref, ref_many and ref_all do per object. """
+        if (lock := self._lock) is None:
+            self.count_reference(stamp)
+            return
+        with lock:
+            if lock is self._lock:
+                self.count_reference(stamp)
+                return
+        # moved to another stripe while we waited for the lock
+        self.reference(stamp)
+
+
+    def count_reference(self, stamp):
+        if (slot := self._slot) is None:
+            self._references += 1
+            self._last_referenced = stamp
+        else:
+            heap = self._heap
+            heap.reference_counts[slot] += 1
+            heap.referenced[slot] = stamp
+        for tally in self._tallies:
+            tally.total_references += 1
+
+
+    @property
+    def references(self):
+        if (slot := self._slot) is not None:
+            return self._heap.reference_counts[slot]
+        return self._references
+
+
+    @references.setter
+    def references(self, references):
+        """ Keep the running totals of every hub holding this object in step """
+        if self._lock is None:
+            self.set_references(references)
+        else:
+            self.locked(self.set_references, references)
+
+
+    def set_references(self, references):
+        delta = references - self.references
+        if (slot := self._slot) is not None:
+            self._heap.reference_counts[slot] = references
+        else:
+            self._references = references
+        for tally in self._tallies:
+            tally.total_references += delta
+
+
+    def locked(self, update, argument):
+        """ update(argument) under this object's lock. Moving between stripes swaps the
+            lock, so if it changed while we waited for it, try again with the new one.
+        """
+        while (lock := self._lock) is not None:
+            with lock:
+                if lock is self._lock:
+                    return update(argument)
+        return update(argument)
+
+
     def listen(self):
         self.listening = True
 
 
+    @property
+    def methods(self):
+        """ This object's own MethodTable. Anything not in it is delegated to the
+            prototype, so a clone's starts out empty.
+        """
+        if (methods := self._methods) is None:
+            # empty, so it changes nothing until it's given methods
+            methods = self._methods = MethodTable()
+            self._shape = None
+        return methods
+
+
+    @methods.setter
+    def methods(self, methods):
+        """ Call sites cache lookups per MethodTable, so plain dicts get wrapped in one. A
+            MethodTable is kept as it is, so objects can deliberately share one.
+        """
+        if not isinstance(methods, MethodTable):
+            methods = MethodTable(methods)
+        previous, self._methods = self._methods, methods
+        self._shape = None
+        if previous is not None:
+            # clones of this object were built on the old table
+            previous.changed()
+
+
+    @property
+    def prototype(self):
+        return self._prototype
+
+
+    @prototype.setter
+    def prototype(self, prototype):
+        if prototype is not None:
+            prototype.delegated_to()
+        self._prototype = prototype
+        self._shape = None
+        if self._methods is not None:
+            # including the shapes of this object's clones, built on top of its own
+            self._methods.changed()
+
+
+    def delegated_to(self):
+        """ Something is about to delegate to this object. Make sure it has a table of its
+            own, so the shapes built on this object's have it in their chain and notice
+            when it changes.
+        """
+        if self._methods is None:
+            self._methods = MethodTable()
+            self._shape = None
+
+
+    @property
+    def shape(self):
+        """ This object's dispatch.Shape: its own methods on top of its prototype's shape,
+            or just its prototype's if it has no methods of its own. None when there's
+            nothing to look methods up in at all.
+        """
+        if (shape := self._shape) is not None and shape.epoch == dispatch.epoch:
+            return shape
+        if (prototype := self._prototype) is not None:
+            parent = prototype.shape
+        elif (everything := GloomObject.everything) is not None and everything is not self:
+            parent = everything.shape
+        else:
+            parent = None
+        shape = self._shape = parent if self._methods is None else self._methods.shape(parent)
+        return shape
+
+
+    def lookup(self, selector):
+        """ The method selector resolves to for this object, or None """
+        if (shape := self._shape) is None or shape.epoch != dispatch.epoch:
+            shape = self.shape
+        if shape is not None:
+            return shape.lookup(selector)
+
+
+    def perform(self, site, *args, **kwargs):
+        """ Call whatever site (a dispatch.CallSite) resolves to on this object, if anything """
+        if (shape := self._shape) is None or shape.epoch != dispatch.epoch:
+            shape = self.shape
+        if (m := site.lookup(shape)) is not None:
+            return m(self, *args, **kwargs)
+
+
     def handle_unary_message(self, selector):
-        if (m := self.methods.get(selector)) is not None:
+        if (m := self.lookup(selector)) is not None:
             return m(self)
 
     
     def handle_keyword_message(self, message):
-        selector = ":".join(message.keys())
-        if (m := self.methods.get(selector)) is not None:
+        if (m := self.lookup(intern_selector(tuple(message)))) is not None:
             return m(self, **message)
 
 
+    def handle_gloom_message(self, message):
+        """ A GloomMessage needs no classifying, its selector is already worked out """
+        message.read_at = clock.now()
+        if (m := self.lookup(message.selector)) is not None:
+            return m(self, *message.arguments)
+
+
     def handle_binary_message(self, message):
-        selector, value = message
-        return self.handle_keyword_message(
-            {selector: selector, "to": value}
-        )
+        operator, value = message
+        if (m := self.lookup(binary_selector(operator))) is not None:
+            return m(self, value)
 
 
-    def send(self, message):
-        self.inbox.append(
-            message
-        )
+    def send(self, message, site=None):
+        """ Queue message in the inbox, oldest first. A listening object receives it (and
+            anything queued before it) straight away and returns its reply.
 
-        if self.listening:
-            return self.receive()
+            Callers that send from a fixed place, like compiled code, can pass the
+            dispatch.CallSite for the message's selector, which is then used to find
+            the method when it's delivered straight away.
+        """
+        if type(message) is GloomMessage:
+            message.sent_at = clock.now()
+        listening = self.listening
+        if (record := self._record) is None:
+            if listening:
+                return self.handle_message(message, site)
+            record = self.record
+        elif listening and not record.inbox:
+            return self.handle_message(message, site)
+
+        inbox = record.inbox
+        if inbox.high_water is None:
+            inbox.append(message)
+        elif not inbox.put(message):
+            if not listening:
+                # blocking would mean delivering to an object that asked not to receive
+                raise MailboxFull(inbox, message)
+            # blocked at the high-water mark, deliver the oldest until there's room
+            self.receive_batch(len(inbox) - inbox.high_water + 1)
+            inbox.append(message)
+
+        if listening and (replies := self.drain()):
+            return replies[-1]
 
 
     def receive(self):
-
-        if not self.inbox:
+        """ Handle the oldest message in the inbox, returning its reply """
+        if self._record is None or not self._record.inbox:
             return
-        
-        message = self.inbox.pop()
-
+        return self.handle_message(self._record.inbox.popleft())
+
+
+    def receive_batch(self, max_n):
+        """ Handle up to max_n messages from the inbox, oldest first, returning their replies """
+        if (record := self._record) is None:
+            return []
+        inbox = record.inbox
+        popleft = inbox.popleft
+        handle = self.handle_message
+        replies = []
+        append = replies.append
+        # a message's method may send or receive more, so check the inbox every time round
+        while max_n > 0 and inbox:
+            append(handle(popleft()))
+            max_n -= 1
+        return replies
+
+
+    def drain(self):
+        """ Handle every message in the inbox, including any sent while draining it """
+        if (record := self._record) is None:
+            return []
+        replies = []
+        inbox = record.inbox
+        while inbox:
+            replies.extend(self.receive_batch(len(inbox)))
+        return replies
+
+
+    def handle_message(self, message, site=None):
+        # the tree walker passes its environment where compiled code passes a CallSite
+        if type(site) is CallSite and type(message) is dict:
+            return self.perform(site, **message)
+        if type(message) is GloomMessage:
+            return self.handle_gloom_message(message)
         if isinstance(message, str):
             return self.handle_unary_message(message)
         elif isinstance(message, dict):
@@ -178,9 +550,8 @@ class GloomObject:
     @location.setter
     @ref
     def location(self, location):
-        del self.objects[self._location]
+        self.objects.relocate(self._location, location, self)
         self._location = location
-        self.objects[self.location] = self
 
 
     @ref
@@ -190,13 +561,39 @@ class GloomObject:
 
     @ref
     def clone_to(self, location):
-        o = GloomObject(receiver=self.receiver, location=location)
-        o.references = self.references
+        """ A copy of this object at location (a fresh address if None) in the same heap.
+
+            Nothing is copied up front: the clone points at the same value and metadata as
+            this object, has it as its prototype, and delegates every method to it until
+            it's given methods of its own. Mailboxes, names and the rest of the side
+            record start empty, as they would for any new object.
+        """
+        self.delegated_to()
+        o = GloomObject.__new__(type(self))
+        o.name = self.name
         o.value = self.value
+        o.receiver = self.receiver
+        o.selector = self.selector
+        o.listening = self.listening
         o.created_at = self.created_at
-        o.updated_at = self.updated_at
-        o.last_referenced = self.last_referenced
-        o.methods = self.methods
+        o._references = self.references
+        o._last_referenced = self.last_referenced
+        o._affinity = self.affinity
+        o._methods = None
+        o._prototype = self
+        o._shape = None
+        o._heap = self._heap
+        o._record = None
+        o._slot = None
+        o._lock = None
+        o.generation = 0
+        o._tallies = ()
+        if self._record is not None and self._record.updated_at != self.created_at:
+            o.updated_at = self._record.updated_at
+        if location is None:
+            location = self._heap.allocate()
+        o._location = location
+        self._heap.store(location, o)
         return o
     
 
@@ -206,13 +603,21 @@ class GloomObject:
     
 
     def safe_repr(self):
+        # most objects were never referenced or updated after they were created, so their
+        # stamps are usually the same and only need rendering once
+        created_at = self.created_at
+        created = str(clock.display(created_at))
+        last_referenced = self.last_referenced
+        referenced = created if last_referenced == created_at else clock.display(last_referenced)
+        updated_at = self.updated_at
+        updated = created if updated_at == created_at else clock.display(updated_at)
         return f"""
         gloom object @{self.location}: {self.value}
             - popularity: {self.popularity_score} (across {self.object_count()} total objects)
             - references: {self.references} (out of {self.global_references()} total references globally)
-            - created at: {self.created_at}
-            - last referenced: {self.last_referenced}
-            - updated at: {self.updated_at}
+            - created at: {created}
+            - last referenced: {referenced}
+            - updated at: {updated}
         """ 
 
 
@@ -246,7 +651,10 @@ class GloomObject:
         
 
     def free(self):
-        self.free_location(self.location)
+        """ Drop this object from its heap. Does nothing once it's gone from its location,
+            since the address may already belong to something else.
+        """
+        self.objects.discard(self._location, self)
 
 
     def free_location(self, location):
@@ -258,12 +666,7 @@ class GloomObject:
 
 
     def free_all(self):
-        """ Note we iterate over keys() explicitly here since Python dictionaries cannot be modified
-            while being iterated over without encountering a runtime exception
-        """
-        keys = list(self.objects.keys())
-        for key in keys:
-            self.objects.pop(key, None)
+        self.objects.free_all()
             
 
     def object_count(self):
@@ -272,6 +675,8 @@ class GloomObject:
 
 class GloomNothing(GloomObject):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, affinity=GloomAffinity.NOTHING)
 
@@ -284,6 +689,9 @@ class GloomNothing(GloomObject):
     
 
 class GloomEverything(GloomObject):
+
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, affinity=GloomAffinity.EVERYTHING)
         self.name = "*"
@@ -297,6 +705,9 @@ class GloomEverything(GloomObject):
     
 
 class GloomSomething(GloomObject):
+
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value, affinity=GloomAffinity.SOMETHING)
 
@@ -308,9 +719,19 @@ class GloomSomething(GloomObject):
         return f"something({self.value})"
     
 
-class GloomPointer(GloomObject):
-    def __init__(self, value):
-        super().__init__(value, affinity=GloomAffinity.REFERENCE)
+class GloomPointer(int):
+    """ An immutable handle to an integer address. Pointers hash and compare as their
+        address, so a hub finds the object at GloomPointer(1) whether it was stored
+        under that pointer, another GloomPointer(1) or plain 1.
+    """
+
+    __slots__ = ()
+
+    affinity = GloomAffinity.REFERENCE
+
+    @property
+    def value(self):
+        return int(self)
 
     def __repr__(self):
         value = self.value
@@ -323,6 +744,8 @@ class GloomPointer(GloomObject):
 
 class GloomProperties(GloomEverything):
 
+    __slots__ = ()
+
     def __init__(self, value):
         super().__init__(value)
         self.value = self.objects
@@ -335,10 +758,7 @@ class GloomProperties(GloomEverything):
 
     @property
     def global_references(self):
-        total = 0
-        for location in self.objects:
-            total += self.objects[location].references
-        return total
+        return self.objects.global_references
 
 
     def free_location(self, location):
@@ -354,12 +774,7 @@ class GloomProperties(GloomEverything):
 
 
     def free_all(self):
-        """ Note we iterate over keys() explicitly here since Python dictionaries cannot be modified
-            while being iterated over without encountering a runtime exception
-        """
-        keys = list(self.objects.keys())
-        for key in keys:
-            self.objects.pop(key, None)
+        self.objects.free_all()
             
 
     def __len__(self):
@@ -390,10 +805,13 @@ class GloomProperties(GloomEverything):
         return self.objects.pop(key, default)
     
 
+    def iter_repr(self, limit=None, every=1):
+        return self.objects.iter_repr(limit, every)
+
+
+    def write_repr(self, fileobj, limit=None, every=1, batch=1024):
+        return self.objects.write_repr(fileobj, limit, every, batch)
+
+
     def __repr__(self):
-        refall()
-        representation = "\t"
-        for key in self.objects:
-            obj_repr = self.get(key).safe_repr()
-            representation += f"{key} : {obj_repr}"
-        return representation
+        return repr(self.objects)
@@ -1,9 +1,68 @@
 
 
+from heapq import heappop, heappush
+from itertools import islice
+
+from gloom import clock
+
+
+class AddressSpace:
+    """ Hands out integer addresses: the lowest recycled one if there is one, otherwise the
+        next never used one. Reusing low addresses first keeps the heap dense.
+    """
+
+    __slots__ = ("next", "free")
+
+    def __init__(self, next=0):
+        self.next = next
+        self.free = []
+
+
+    def allocate(self):
+        if self.free:
+            return heappop(self.free)
+        address = self.next
+        self.next += 1
+        return address
+
+
+    def release(self, address):
+        heappush(self.free, address)
+
+
+class Tally:
+    """ A hub's running total of references, which the objects stored in it bump """
+
+    __slots__ = ("total_references",)
+
+    def __init__(self):
+        self.total_references = 0
+
+
 class GloomHub:
+    """ Objects by location, plus the running total of their references.
+
+        GloomObject.objects is the one shared heap every object registers into, unless
+        it's created with a heap of its own (one per interpreter, say). Hubs also serve
+        as plain namespaces, like an object's names.
+
+        Anything stored here that has a tallies tuple (GloomObjects) is handed the hub's
+        Tally, and bumps it whenever its own reference count changes. That keeps
+        global_references O(1) instead of a sum over every object, and lets free_all
+        drop everything at once by starting a new tally: the old one is left to the
+        objects that were freed.
+    """
 
     def __init__(self):
         self.objects = {}
+        self.tally = Tally()
+        # how many stored objects are also stored under another location here
+        self.duplicates = 0
+        self.addresses = AddressSpace()
+        # every key in a list, and each key's index in it, once something asks for them
+        # with listing(). Off until then, it costs every store and pop a little.
+        self.listed = None
+        self.listed_at = None
 
 
     @property
@@ -11,33 +70,186 @@ class GloomHub:
         return len(self.objects)
     
 
+    @property
+    def total_references(self):
+        return self.tally.total_references
+
+
+    @total_references.setter
+    def total_references(self, total):
+        self.tally.total_references = total
+
+
     @property
     def global_references(self):
-        total = 0
-        for location in self.objects:
-            total += self.objects[location].references
-        return total
+        return self.tally.total_references
+
+
+    def allocate(self):
+        """ A free integer address, skipping any that were taken by storing there directly """
+        while (address := self.addresses.allocate()) in self.objects:
+            pass
+        return address
+
+
+    def release(self, address):
+        """ Let allocate hand address out again """
+        self.addresses.release(address)
+
+
+    def vacated(self, key):
+        """ Recycle key once nothing is stored there, if it's an address """
+        if isinstance(key, int) and not isinstance(key, bool) and key >= 0:
+            self.addresses.release(int(key))
+
+
+    def compact(self):
+        """ Move everything stored at an integer address down into the first n addresses
+            allocate would hand out (0..n-1 here), keeping their order, so allocation
+            carries on from a dense heap. Objects living here are relocated and told their
+            new location directly, not through GloomObject.move, so compacting doesn't
+            count as referencing them. Returns {old address: new}.
+        """
+        addresses = sorted(key for key in self.objects if self.compactable(key))
+        moved = {}
+        for n, old in enumerate(addresses):
+            if (new := self.nth_address(n)) == old:
+                continue
+            value = self.objects[old]
+            # keep pointers pointers
+            target = type(old)(new)
+            if getattr(value, "_heap", None) is self and value.location == old:
+                self.relocate(old, target, value)
+                value._location = target
+            else:
+                self.store(target, self.pop(old))
+            moved[old] = new
+        self.addresses = AddressSpace(len(addresses))
+        return moved
+
+
+    def attach(self, value):
+        if (tallies := getattr(value, "tallies", None)) is not None:
+            tally = self.tally
+            if tally in tallies:
+                self.duplicates += 1
+            value.tallies = tallies + (tally,)
+            tally.total_references += value.references
+
+
+    def detach(self, value):
+        if (tallies := getattr(value, "tallies", None)) is not None:
+            tally = self.tally
+            index = tallies.index(tally)
+            value.tallies = tallies = tallies[:index] + tallies[index + 1:]
+            if tally in tallies:
+                self.duplicates -= 1
+            tally.total_references -= value.references
+
+
+    def ref_many(self, locations):
+        """ Reference the object at each location, once per time it's listed. locations can
+            be any iterable and is consumed lazily. Raises KeyError at the first location
+            with nothing in it, after referencing everything listed before it.
+        """
+        now = clock.now()
+        objects = self.objects
+        for location in locations:
+            objects[location].reference(now)
+
+
+    def ref_all(self):
+        """ Reference every object in the hub once, however many locations it's stored at """
+        now = clock.now()
+        values = self.objects_now().values()
+        if self.duplicates:
+            values = dict.fromkeys(values)
+        for value in values:
+            try:
+                reference = value.reference
+            except AttributeError:
+                continue
+            reference(now)
+
+
+    def objects_now(self):
+        """ The objects by location, as a mapping that's safe to iterate. That's the store
+            itself here, hubs shared between threads hand out a copy.
+        """
+        return self.objects
+
+
+    def compactable(self, key):
+        """ Whether compact() should move whatever is stored at key """
+        return isinstance(key, int) and not isinstance(key, bool) and key >= 0
+
+
+    def nth_address(self, n):
+        """ The address a fresh address space hands out nth, counting from 0 """
+        return n
 
 
     def free_location(self, location):
-        self.objects.pop(location, None)
+        self.pop(location, None)
 
 
     def store(self, key, value):
+        if (previous := self.objects.get(key)) is not None:
+            self.detach(previous)
+        elif self.listed is not None:
+            self.add_listed(key)
         self.objects[key] = value
+        self.attach(value)
+
+
+    def listing(self):
+        """ Every key in a list that's kept up to date from now on, so it can be walked a
+            slice at a time by index. A removed key's place is taken by the last key, so
+            the order only changes where keys come and go.
+        """
+        if self.listed is None:
+            self.listed = list(self.objects)
+            self.listed_at = {key: i for i, key in enumerate(self.listed)}
+        return self.listed
+
+
+    def add_listed(self, key):
+        if key not in self.listed_at:
+            self.listed_at[key] = len(self.listed)
+            self.listed.append(key)
+
+
+    def remove_listed(self, key):
+        if (i := self.listed_at.pop(key, None)) is None:
+            return
+        listed = self.listed
+        last = listed.pop()
+        if i < len(listed):
+            listed[i] = last
+            self.listed_at[last] = i
 
 
     def get(self, location, default=None):
         return self.objects.get(location, default)
 
 
+    def relocate(self, old, new, value):
+        """ Move value from old to new, for GloomObject's location setter """
+        del self[old]
+        self[new] = value
+
+
     def free_all(self):
-        """ Note we iterate over keys() explicitly here since Python dictionaries cannot be modified
-            while being iterated over without encountering a runtime exception
+        """ Drop everything in O(1): a fresh store, tally and address space. Freed objects
+            keep the old tally, so whatever still happens to them doesn't count here.
         """
-        keys = list(self.objects.keys())
-        for key in keys:
-            self.objects.pop(key, None)
+        self.objects = {}
+        self.tally = Tally()
+        self.duplicates = 0
+        self.addresses = AddressSpace()
+        if self.listed is not None:
+            self.listed = []
+            self.listed_at = {}
             
 
     def __len__(self):
@@ -53,11 +265,14 @@ class GloomHub:
     
 
     def __setitem__(self, key, value):
-        self.objects[key] = value
+        self.store(key, value)
 
 
     def __delitem__(self, key):
-        del self.objects[key]
+        self.detach(self.objects.pop(key))
+        if self.listed is not None:
+            self.remove_listed(key)
+        self.vacated(key)
 
 
     def keys(self):
@@ -65,13 +280,59 @@ class GloomHub:
     
 
     def pop(self, key, default=None):
-        return self.objects.pop(key, default)
+        if key not in self.objects:
+            return default
+        value = self.objects.pop(key)
+        self.detach(value)
+        if self.listed is not None:
+            self.remove_listed(key)
+        self.vacated(key)
+        return value
     
 
+    def discard(self, key, value):
+        """ pop key, but only if value is what's stored there, so a stale handle can't free
+            whatever has since taken its address. Returns whether it was.
+        """
+        if self.objects.get(key) is not value:
+            return False
+        self.pop(key)
+        return True
+
+
+    def iter_repr(self, limit=None, every=1):
+        """ The hub's repr a piece at a time: a leading tab, then one "location : safe_repr"
+            chunk per object. limit and every pick a sample instead of everything: at most
+            limit objects, taking every nth. Printing references what gets printed, all of
+            it before the first object is rendered.
+        """
+        if limit is None and every == 1:
+            self.ref_all()
+            locations = list(self.objects_now())
+        else:
+            locations = list(islice(self.objects_now(), 0, None if limit is None else limit * every, every))
+            self.ref_many(location for location in locations if hasattr(self.objects[location], "reference"))
+        yield "\t"
+        objects = self.objects
+        for location in locations:
+            if (value := objects.get(location)) is not None:
+                yield f"{location} : {value.safe_repr()}"
+
+
+    def write_repr(self, fileobj, limit=None, every=1, batch=1024):
+        """ Write iter_repr to fileobj, batch chunks per write. Returns how many objects it wrote. """
+        written = 0
+        chunks = []
+        for chunk in self.iter_repr(limit, every):
+            chunks.append(chunk)
+            if len(chunks) == batch:
+                fileobj.write("".join(chunks))
+                written += len(chunks)
+                chunks.clear()
+        fileobj.write("".join(chunks))
+        # the leading tab isn't an object
+        return written + len(chunks) - 1
+
+
     def __repr__(self):
-        refall()
-        representation = "\t"
-        for key in self.objects:
-            obj_repr = self.get(key).safe_repr()
-            representation += f"{key} : {obj_repr}"
-        return representation
+        return "".join(self.iter_repr())
@@ -0,0 +1,68 @@
+""" Mailboxes: the queues messages wait in until a GloomObject receives them.
+
+    A Mailbox is a deque, so messages are received oldest first and taking one off the
+    front is O(1). It can be given a high-water mark, and what happens to a message sent
+    to a mailbox at the mark depends on its overflow policy:
+
+        BLOCK   the sender waits until there's room. Nothing else runs while it waits,
+                so in practice the sender delivers the oldest queued messages itself.
+                That would override a receiver that isn't listening, so sending to
+                one of those raises MailboxFull instead, as REPORT does
+        DROP    the message is thrown away and counted in the mailbox's dropped
+        REPORT  MailboxFull is raised to the sender, and the message isn't queued
+
+    Without a high-water mark (the default) a mailbox just keeps growing.
+"""
+
+from collections import deque
+from enum import Enum
+
+
+class Overflow(Enum):
+
+    BLOCK = "block"
+    DROP = "drop"
+    REPORT = "report"
+
+
+class MailboxFull(Exception):
+
+    def __init__(self, mailbox, message):
+        super().__init__(f"mailbox is at its high-water mark of {mailbox.high_water}")
+        self.mailbox = mailbox
+        self.message = message
+
+
+class Mailbox(deque):
+
+    __slots__ = ("high_water", "overflow", "dropped")
+
+    def __init__(self, messages=(), high_water=None, overflow=Overflow.BLOCK):
+        super().__init__(messages)
+        self.high_water = high_water
+        self.overflow = overflow
+        self.dropped = 0
+
+
+    def __repr__(self):
+        return f"Mailbox({len(self)} queued, high_water={self.high_water}, overflow={self.overflow.value})"
+
+
+    def full(self):
+        return self.high_water is not None and len(self) >= self.high_water
+
+
+    def put(self, message):
+        """ Queue message if there's room, or deal with it as the overflow policy says.
+            False if it overflows by blocking: whoever sent it has to make room and put
+            it again.
+        """
+        if self.high_water is None or len(self) < self.high_water:
+            self.append(message)
+            return True
+        if self.overflow is Overflow.DROP:
+            self.dropped += 1
+            return True
+        if self.overflow is Overflow.REPORT:
+            raise MailboxFull(self, message)
+        return False
@@ -1,29 +1,78 @@
-from gloom.gloom import GloomObject
-from gloom.gloom import GloomValue, GloomPointer
-from gloom.gloom import GloomAffinity
+""" GloomMessage: a message as it travels to a GloomObject, classified once.
 
-class GloomMessage(GloomObject):
+    GloomObject.send takes bare str, (operator, value) and {keyword: argument} messages
+    and works out which it was given on every delivery. A GloomMessage carries that
+    already worked out: its kind, its interned selector, its arguments as a tuple and
+    the times it was made, sent and read. Every kind is delivered the same way, as
+    method(receiver, *arguments), so keyword arguments go in selector order, the order
+    keyword methods already declare them in.
 
-    def __init__(self, affinity, selector, arguments):
-        super().__init__(None, affinity=GloomAffinity.NOTHING)
+    Bare messages stay the common case and aren't converted: making a GloomMessage per
+    send costs more than classifying a bare one on delivery. GloomMessages are for
+    senders that want the timestamps, or build a message once and send it many times.
+"""
+
+from enum import IntEnum
+
+from gloom import clock
+from gloom.dispatch import binary_selector, intern_selector
+
+
+class Kind(IntEnum):
+
+    UNARY = 0
+    BINARY = 1
+    KEYWORD = 2
+
+
+# Module level, reading members off an Enum class is slow
+UNARY, BINARY, KEYWORD = Kind
+
+
+class GloomMessage:
+
+    __slots__ = ("kind", "selector", "arguments", "sender", "created_at", "sent_at", "read_at")
+
+    def __init__(self, kind, selector, arguments=(), sender=None):
+        self.kind = kind
         self.selector = selector
         self.arguments = arguments
-        self.created_at = datetime.now()
+        self.sender = sender
+        self.created_at = clock.now()
         self.sent_at = None
-        self.last_read = None
+        self.read_at = None
 
 
-    def send(self, sender, recipient):
-        assert isinstance(recipient, GloomObject)
-        self.recipient.inbox.append(
-            self
-        )
-        
-
     def __repr__(self):
-        pass
+        kind = self.kind.name.lower()
+        return f"GloomMessage({kind}, {self.selector!r}, {self.arguments!r})"
+
+
+    @classmethod
+    def of(cls, message, sender=None):
+        """ The GloomMessage for a bare str, (operator, value) or {keyword: argument} message """
+        if isinstance(message, GloomMessage):
+            return message
+        if isinstance(message, str):
+            return cls.unary(message, sender)
+        if isinstance(message, dict):
+            return cls.keyword(tuple(message), tuple(message.values()), sender)
+        if isinstance(message, tuple) and len(message) == 2:
+            return cls.binary(*message, sender)
+        raise TypeError(f"can't make a message out of {message!r}")
+
+
+    @classmethod
+    def unary(cls, selector, sender=None):
+        return cls(UNARY, intern_selector((selector,)), (), sender)
+
 
+    @classmethod
+    def binary(cls, operator, value, sender=None):
+        return cls(BINARY, binary_selector(operator), (value,), sender)
 
 
-v = GloomValue("hello world", GloomAffinity.NOTHING)
-print_ = GloomObject(v, location=GloomPointer(1))
+    @classmethod
+    def keyword(cls, keywords, arguments, sender=None):
+        """ keywords is a tuple like ("at", "put"), arguments the values in the same order """
+        return cls(KEYWORD, intern_selector(keywords), arguments, sender)
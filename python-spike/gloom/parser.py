@@ -1,6 +1,10 @@
 from pprint import pprint as print
 
+import marshal
+import re
+from array import array
 from enum import Enum
+from functools import partial
 
 class Token(Enum):
     LPAREN = "("
@@ -22,7 +26,134 @@ class Token(Enum):
     UNARY_MESSAGE = "unary_message"
 
 
+# One alternative per token kind, tried in order, each skipping the whitespace in front of
+# it. These mirror CharacterLexer's rules: a "." only belongs to a number when a digit
+# follows it, names are runs of identifier characters (no digits), and an unterminated
+# string runs to the end of the program.
+TOKEN_PATTERN = re.compile(r"""\s*(?:
+      (?P<LPAREN>\()
+    | (?P<RPAREN>\))
+    | (?P<HASH>\#)
+    | (?P<PERIOD>\.)
+    | (?P<BINARY_MESSAGE>[-+,/%*])
+    | :(?P<NAMED_PARAMETER>[^\W\d]*)
+    | "(?P<DOUBLE_QUOTED>[^"]*)"?
+    | '(?P<SINGLE_QUOTED>[^']*)'?
+    | (?P<NUMBER>\d(?:\d|\.(?=\d))*)
+    | (?P<OBJECT>[^\W\d]+)
+    | (?P<ERROR>\S)
+)""", re.VERBOSE)
+
+
+PATTERN_TOKENS = {
+    "LPAREN": Token.LPAREN,
+    "RPAREN": Token.RPAREN,
+    "HASH": Token.HASH,
+    "PERIOD": Token.PERIOD,
+    "BINARY_MESSAGE": Token.BINARY_MESSAGE,
+    "NAMED_PARAMETER": Token.NAMED_PARAMETER,
+    "DOUBLE_QUOTED": Token.STRING,
+    "SINGLE_QUOTED": Token.STRING,
+    "NUMBER": Token.NUMBER,
+    "OBJECT": Token.OBJECT,
+}
+
+
+BOOLEANS = ("true", "false")
+
+
+CHUNK_SIZE = 64 * 1024
+
+
 class Lexer:
+    """ Single pass lexer: one compiled pattern walks the program and every token's text
+        is sliced straight out of the source, so there is no per-character buffering.
+        Produces the same (Token, text) pairs as CharacterLexer.
+    """
+
+    def __init__(self):
+        self.program = ""
+        self.position = 0
+        self.tokens = []
+
+
+    def reset(self):
+        self.program = ""
+        self.position = 0
+        self.tokens = []
+
+
+    def scan(self, program, final=True):
+        """ Yield (Token, text) pairs for program, leaving self.position where scanning stopped.
+
+            Unless program is the final piece of the source, stop in front of a token the
+            next piece could still extend: a name or named parameter running up to its end,
+            an unterminated string, or a number that ends there or one character short of
+            it ("6." + "0"). Anything else, a closing period included, is yielded at once.
+        """
+        start = self.position
+        end = len(program)
+        for match in TOKEN_PATTERN.finditer(program):
+            kind = match.lastgroup
+            if not final and match.end() >= end - 1 and self.extendable(match, kind, end):
+                self.position = start + match.start()
+                return
+            text = match.group(kind)
+            if kind == "ERROR":
+                raise SyntaxError(
+                    f"no idea what to do with {text!r} at position {start + match.start(kind)}"
+                )
+            token_type = PATTERN_TOKENS[kind]
+            if token_type is Token.OBJECT and text in BOOLEANS:
+                token_type = Token.BOOLEAN
+            yield token_type, text
+        self.position = start + len(program)
+
+
+    @staticmethod
+    def extendable(match, kind, end):
+        """ Could more text after end change the token match found? """
+        if kind == "NUMBER":
+            return match.end() == end or match.string[match.end()] == "."
+        if match.end() < end:
+            return False
+        if kind in ("OBJECT", "NAMED_PARAMETER"):
+            return True
+        # a string is only finished once its closing quote has been read
+        return kind in ("DOUBLE_QUOTED", "SINGLE_QUOTED") and match.end(kind) == end
+
+
+    def iter_tokens(self, stream, chunk_size=CHUNK_SIZE):
+        """ Lazily yield (Token, text) pairs from a file object or an iterable of text chunks.
+            Only the unfinished token at the end of each chunk is held in memory.
+        """
+        if isinstance(stream, str):
+            stream = (stream,)
+        elif hasattr(stream, "read"):
+            stream = iter(partial(stream.read, chunk_size), "")
+
+        self.position = 0
+        pending = ""
+        for chunk in stream:
+            pending += chunk
+            start = self.position
+            yield from self.scan(pending, final=False)
+            pending = pending[self.position - start:]
+        yield from self.scan(pending)
+
+
+    def lex(self, program):
+        self.program = program
+        self.position = 0
+        self.tokens.extend(self.scan(program))
+        return self.tokens
+
+
+
+class CharacterLexer:
+    """ The original character-at-a-time lexer. Lexer replaces it, but it is kept around
+        as the baseline for benchmarks/bench_lexer.py
+    """
 
     def __init__(self):
         self.program = ""
@@ -205,14 +336,14 @@ class Lexer:
 
 
     def check_true(self):
-        end_index = self.current_position + 4            
-        maybe_true = self.program[self.current_position:end_index]
+        end_index = self.position + 4            
+        maybe_true = self.program[self.position:end_index]
         return maybe_true == "true"
     
 
     def check_false(self):
-        end_index = self.current_position + 5      
-        maybe_false = self.program[self.current_position:end_index]
+        end_index = self.position + 5      
+        maybe_false = self.program[self.position:end_index]
         return maybe_false == "false"
     
 
@@ -281,12 +412,16 @@ class Lexer:
 
 class EverythingNode:
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
 
 class MessageSendNode:
 
+    __slots__ = ("receiver", "arguments")
+
     def __init__(self, receiver, arguments):
         self.receiver = receiver
         self.arguments = arguments
@@ -301,14 +436,15 @@ class MessageSendNode:
     
 
     def evaluate(self, environment):
-        if isinstance(self.receiver, MessageSendNode):
-            self.receiver = self.receiver.evaluate(environment)
+        receiver = self.receiver
+        if isinstance(receiver, MessageSendNode):
+            receiver = receiver.evaluate(environment)
 
         message_payload = {}
         for argument in self.arguments:
             message_payload[argument.selector] = argument.evaluate(environment)
 
-        value = self.receiver.send(message_payload, environment)
+        value = receiver.send(message_payload, environment)
         return value
 
 
@@ -316,6 +452,8 @@ class MessageSendNode:
 
 class MessageArgumentNode:
 
+    __slots__ = ("selector", "value")
+
     def __init__(self, selector, value):
         self.selector = selector
         self.value = value
@@ -327,7 +465,7 @@ class MessageArgumentNode:
 
     def evaluate(self, environment):
         if isinstance(self.value, MessageSendNode):
-            self.value.evaluate(environment)
+            return self.value.evaluate(environment)
         if isinstance(self.value, list):
             return []
         return self.value.evaluate(environment)
@@ -337,14 +475,31 @@ class MessageArgumentNode:
 
 class ObjectNode:
 
+    __slots__ = ("value", "kind", "_properties")
+
     def __init__(self, value, kind):
         self.value = value
         self.kind = kind
-        self.properties = {}
+        self._properties = None
+
+
+    @property
+    def properties(self):
+        """ Most objects never have anything set on them, so this is only allocated on first use """
+        if self._properties is None:
+            self._properties = {}
+        return self._properties
 
 
     def evaluate(self, environment):
-        return self if self.kind != 'object' else self.properties.get(self.value, 0)
+        """ Literals evaluate to themselves, names to what environment.names has for them
+            (0 if nothing), unless something was set on this node itself
+        """
+        if self.kind != 'object':
+            return self
+        if self._properties and self.value in self._properties:
+            return self._properties[self.value]
+        return environment.names.get(self.value, 0)
 
 
     def send(self, payload, environment):
@@ -365,7 +520,175 @@ class ObjectNode:
         return f"Object({self.value}, {self.kind})"
 
 
+class ASTArena:
+    """ Flat, array-backed form of a parsed program.
+
+        Every node is a row across parallel arrays -- its kind, an operand (a constant or
+        selector id) and a run of child indices -- instead of a Python object per node.
+        Children are stored before their parents, so each node's children are contiguous.
+    """
+
+    SEND = 0
+    ARGUMENT = 1
+    UNARY_ARGUMENT = 2
+    LITERAL = 3
+    NAME = 4
+    ARRAY = 5
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.operands = array("i")
+        self.first_child = array("i")
+        self.child_count = array("i")
+        self.children = array("i")
+        self.statements = array("i")
+        self.selectors = []
+        self.selector_ids = {}
+        self.constants = []
+        self.constant_ids = {}
+
+
+    def __len__(self):
+        return len(self.statements)
+
+
+    @property
+    def node_count(self):
+        return len(self.kinds)
+
+
+    def selector_id(self, selector):
+        if (index := self.selector_ids.get(selector)) is None:
+            index = self.selector_ids[selector] = len(self.selectors)
+            self.selectors.append(selector)
+        return index
+
+
+    def constant_id(self, value, kind):
+        key = (kind, value)
+        if (index := self.constant_ids.get(key)) is None:
+            index = self.constant_ids[key] = len(self.constants)
+            self.constants.append(key)
+        return index
+
+
+    def add_node(self, kind, operand, children=()):
+        self.kinds.append(kind)
+        self.operands.append(operand)
+        self.first_child.append(len(self.children))
+        self.child_count.append(len(children))
+        self.children.extend(children)
+        return len(self.kinds) - 1
+
+
+    def add(self, node):
+        """ Flatten a node and everything under it, returning its index """
+        if isinstance(node, MessageSendNode):
+            children = [self.add(node.receiver)]
+            children.extend(self.add(argument) for argument in node.arguments)
+            return self.add_node(self.SEND, 0, children)
+        if isinstance(node, MessageArgumentNode):
+            selector = self.selector_id(node.selector)
+            if isinstance(node.value, list):
+                return self.add_node(self.UNARY_ARGUMENT, selector)
+            return self.add_node(self.ARGUMENT, selector, [self.add(node.value)])
+        if node.kind == "array":
+            return self.add_node(self.ARRAY, 0, [self.add(item) for item in node.value])
+        if node.kind == "object":
+            return self.add_node(self.NAME, self.selector_id(node.value))
+        return self.add_node(self.LITERAL, self.constant_id(node.value, node.kind))
+
+
+    def add_statement(self, node):
+        self.statements.append(self.add(node))
+
+
+    def node(self, index):
+        """ Rebuild the node tree rooted at index """
+        kind = self.kinds[index]
+        operand = self.operands[index]
+        first = self.first_child[index]
+        children = self.children[first:first + self.child_count[index]]
+        if kind == self.SEND:
+            return MessageSendNode(
+                self.node(children[0]),
+                [self.node(child) for child in children[1:]]
+            )
+        if kind == self.ARGUMENT:
+            return MessageArgumentNode(self.selectors[operand], self.node(children[0]))
+        if kind == self.UNARY_ARGUMENT:
+            return MessageArgumentNode(self.selectors[operand], [])
+        if kind == self.ARRAY:
+            return ObjectNode([self.node(child) for child in children], "array")
+        if kind == self.NAME:
+            return ObjectNode(self.selectors[operand], "object")
+        constant_kind, value = self.constants[operand]
+        return ObjectNode(value, constant_kind)
+
+
+    def statement(self, index):
+        return self.node(self.statements[index])
+
+
+    def materialize(self):
+        """ The program as a list of MessageSendNodes, like Parser.parse_program returns """
+        return [self.node(index) for index in self.statements]
+
+
+    def dumps(self):
+        return marshal.dumps((
+            self.kinds.tobytes(),
+            self.operands.tobytes(),
+            self.first_child.tobytes(),
+            self.child_count.tobytes(),
+            self.children.tobytes(),
+            self.statements.tobytes(),
+            self.selectors,
+            self.constants,
+        ))
+
+
+    @classmethod
+    def loads(cls, data):
+        arena = cls()
+        (
+            kinds, operands, first_child, child_count, children, statements,
+            arena.selectors, arena.constants
+        ) = marshal.loads(data)
+        arena.kinds.frombytes(kinds)
+        arena.operands.frombytes(operands)
+        arena.first_child.frombytes(first_child)
+        arena.child_count.frombytes(child_count)
+        arena.children.frombytes(children)
+        arena.statements.frombytes(statements)
+        arena.selector_ids = {selector: i for i, selector in enumerate(arena.selectors)}
+        arena.constant_ids = {constant: i for i, constant in enumerate(arena.constants)}
+        return arena
+
+
+
+# FIRST sets for the grammar in the README: the token types each rule can start with.
+# One token of lookahead against these is enough to pick a rule, so the parser never
+# has to try one and back out.
+VALUE_FIRST = frozenset({
+    Token.NUMBER,
+    Token.STRING,
+    Token.HASH,
+    Token.BOOLEAN,
+    Token.OBJECT,
+    Token.LPAREN,
+})
+
+ARGUMENT_FIRST = frozenset({
+    Token.NAMED_PARAMETER,
+    Token.BINARY_MESSAGE,
+})
+
+
 class Parser:
+    """ Predictive recursive descent parser: every choice is made by looking at the type of
+        the current token, so no exceptions are raised while parsing a valid program.
+    """
 
     def __init__(self, tokens=None):
         if tokens is None:
@@ -375,6 +698,7 @@ class Parser:
         self.position = 0
         self.target = None
         self.buffer = []
+        self.token_source = None
 
 
     def parse(self, program_string):
@@ -383,12 +707,38 @@ class Parser:
         return self.parse_program()
 
 
+    def iter_statements(self, stream):
+        """ Parse a file object or an iterable of text chunks one statement at a time,
+            yielding each MessageSendNode as soon as its closing period has been read.
+
+            Tokens are pulled from the lexer on demand and dropped once their statement
+            is parsed, so memory stays flat no matter how long the program is.
+        """
+        self.tokens = []
+        self.position = 0
+        self.token_source = Lexer().iter_tokens(stream)
+        while not self.eof():
+            yield self.parse_statement()
+            del self.tokens[:self.position]
+            self.position = 0
+
+
+    def pull(self):
+        """ Buffer the next token from the token source, if there is one left """
+        token = next(self.token_source, None)
+        if token is None:
+            self.token_source = None
+        else:
+            self.tokens.append(token)
+
+
     def eof(self):
-        try:
-            self.current_token
+        if self.position < len(self.tokens):
             return False
-        except IndexError:
-            return True
+        if self.token_source is not None:
+            self.pull()
+            return self.position >= len(self.tokens)
+        return True
         
 
     def advance(self):
@@ -401,62 +751,66 @@ class Parser:
 
     @property
     def current_token(self):
-        return self.tokens[self.position]
+        return None if self.eof() else self.tokens[self.position]
     
 
     @property
     def current_tokentype(self):
-        return self.current_token[0]
+        if self.position < len(self.tokens) or not self.eof():
+            return self.tokens[self.position][0]
+        return None
     
 
     @property
     def current_tokenvalue(self):
-        return self.current_token[1]
+        return self.tokens[self.position][1]
 
     
     def consume(self, kind):
-        if self.current_tokentype == kind:
+        if self.current_tokentype is kind:
             self.advance()
         else:
-            raise SyntaxError(f'weird, I expected {kind}, but got {self.current_tokentype} instead')
+            raise SyntaxError(f'weird, I expected {kind}, but got {self.describe_current()} instead')
 
 
-    def peek(self, kinds):
-        if not isinstance(kinds, list):
-            kinds = [kinds]
-        self.advance()
-        if self.eof():
-            self.retreat()
-            return False
-        is_of_kind = self.current_tokentype in kinds
-        self.retreat()
-        return is_of_kind
+    def describe_current(self):
+        return "the end of the program" if self.eof() else self.current_tokentype
 
-    
 
     def is_lparen(self):
-        return self.current_tokentype == Token.LPAREN
+        return self.current_tokentype is Token.LPAREN
     
 
     def is_rparen(self):
-        return self.current_tokentype == Token.RPAREN
+        return self.current_tokentype is Token.RPAREN
     
 
     def is_period(self):
-        return self.current_tokentype == Token.PERIOD
+        return self.current_tokentype is Token.PERIOD
     
 
     def is_message_parameter(self):
-        return self.current_tokentype in (
-            Token.BINARY_MESSAGE,
-            Token.NAMED_PARAMETER
-        )
+        return self.current_tokentype in ARGUMENT_FIRST
 
 
-    def parse_program(self):
+    def parse_program(self, arena=False):
+        """ Parse every statement, as a list of MessageSendNodes or, with arena=True, as an
+            ASTArena that only ever holds one statement's nodes as objects at a time
+        """
+        if arena:
+            return self.parse_arena()
         return self.parse_statements()
 
 
+    def parse_arena(self):
+        arena = ASTArena()
+        while not self.eof():
+            arena.add_statement(
+                self.parse_statement()
+            )
+        return arena
+
+
     def parse_statements(self):
         statements = []
         while not self.eof():
@@ -466,70 +820,51 @@ class Parser:
         return statements
     
 
-    def prepend_everything_token(self):
-        self.tokens.insert(
-            self.position, (Token.OBJECT, "Everything")
+    def parse_everything(self):
+        """ Statements that start with a message parameter are sent to Everything """
+        return ObjectNode(
+            "Everything",
+            "object"
         )
 
 
-
     def parse_statement(self):
         if self.is_message_parameter():
-            self.prepend_everything_token()
-        value = self.parse_message_send()
+            value = self.parse_message_send(self.parse_everything())
+        elif self.current_tokentype in VALUE_FIRST:
+            value = self.parse_message_send()
+        else:
+            raise SyntaxError(
+                f"a statement can't start with {self.describe_current()}"
+            )
         self.consume(Token.PERIOD)
         return value
 
 
-    def parse_message_send(self):
+    def parse_message_send(self, receiver=None):
+        if receiver is None:
+            receiver = self.parse_receiver()
         return MessageSendNode(
-            self.parse_receiver(), 
+            receiver,
             self.parse_arguments()
         )
     
 
     def parse_receiver(self):
-        try:
-            self.consume(Token.LPAREN)
-            receiver = self.parse_message_send()
-            self.consume(Token.RPAREN)
-            return receiver
-        except SyntaxError:
-            return self.parse_value()
-
-
-    def parse_unary_argument(self):
-        value = MessageArgumentNode(
-            self.current_tokenvalue,
-            []
-        )
-        self.advance()
-        return value
-
-
-    def parse_named_argument(self):
-        value = MessageArgumentNode(
-            self.current_tokenvalue,
-            self.parse_value()
-        )
-        self.advance()
-        return value
+        """ receiver = "(" message_send ")" | value, and value already covers the first case """
+        return self.parse_value()
 
 
     def parse_unary_or_named_argument(self):
-        values = [
-            Token.LPAREN,
-            Token.STRING,
-            Token.NUMBER,
-            Token.BOOLEAN,
-            Token.OBJECT,
-            Token.HASH
-        ]
-        if not self.peek(values):
-            value = self.parse_unary_argument()
+        selector = self.parse_operator()
+        if self.current_tokentype in VALUE_FIRST:
+            value = self.parse_value()
         else:
-            value = self.parse_binary_argument()
-        return value
+            value = []
+        return MessageArgumentNode(
+            selector,
+            value
+        )
     
 
     def parse_binary_argument(self):
@@ -547,16 +882,15 @@ class Parser:
 
     def parse_arguments(self):
         arguments = []
-        while not self.eof() and not self.is_period() and not self.is_rparen():
-            match self.current_tokentype:
-                case Token.NAMED_PARAMETER:
-                    arguments.append(
-                        self.parse_unary_or_named_argument()
-                    )
-                case Token.BINARY_MESSAGE:
-                    arguments.append(
-                        self.parse_binary_argument()
-                    )
+        while (token_type := self.current_tokentype) in ARGUMENT_FIRST:
+            if token_type is Token.NAMED_PARAMETER:
+                arguments.append(
+                    self.parse_unary_or_named_argument()
+                )
+            else:
+                arguments.append(
+                    self.parse_binary_argument()
+                )
         return arguments
         
 
@@ -585,7 +919,7 @@ class Parser:
             [],
             "array"
         )
-        while not (self.eof() or self.is_rparen()):
+        while self.current_tokentype in VALUE_FIRST:
             value.value.append(
                 self.parse_value()
             )
@@ -612,34 +946,37 @@ class Parser:
     
         
 
+    def parse_parenthesized(self):
+        self.consume(Token.LPAREN)
+        value = self.parse_message_send()
+        self.consume(Token.RPAREN)
+        return value
+
+
     def parse_value(self):
-        match self.current_tokentype:
-            # parse literal
-            case Token.NUMBER:
-                return self.parse_number()
-            case Token.STRING:
-                return self.parse_string()
-            case Token.HASH:
-                return self.parse_array()
-            case Token.BOOLEAN:
-                return self.parse_boolean()
-
-            # parse name
-            case Token.OBJECT:
-                return self.parse_object()
-            
-            # parse message send
-            case Token.LPAREN:
-                self.consume(Token.LPAREN)
-                value = self.parse_message_send()
-                self.consume(Token.RPAREN)
-                return value
-            case _:
-                raise Exception(
-                    f"hmmm i was expecting something nicer like a number | string | hash | boolean | object but got {self.current_token} instead ;//"
-                )
-        
-    
+        """ value = literal | name | "(" message_send ")", picked by the current token """
+        parse = VALUE_PARSERS.get(self.current_tokentype)
+        if parse is None:
+            raise SyntaxError(
+                f"hmmm i was expecting something nicer like a number | string | hash | boolean | object but got {self.describe_current()} instead ;//"
+            )
+        return parse(self)
+
+
+VALUE_PARSERS = {
+    # parse literal
+    Token.NUMBER: Parser.parse_number,
+    Token.STRING: Parser.parse_string,
+    Token.HASH: Parser.parse_array,
+    Token.BOOLEAN: Parser.parse_boolean,
+
+    # parse name
+    Token.OBJECT: Parser.parse_object,
+
+    # parse message send
+    Token.LPAREN: Parser.parse_parenthesized,
+}
+
 
 
 if __name__ == '__main__':
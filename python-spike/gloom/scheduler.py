@@ -0,0 +1,203 @@
+""" Running GloomObjects as actors on an asyncio event loop.
+
+    GloomObject.send delivers a message there and then, so a slow method holds up its
+    sender and everything waiting behind it. A Scheduler instead gives each object it
+    delivers to an actor: a mailbox of (message, future) pairs. send() queues a message
+    and hands back a future for the method's reply (tell() queues one when nobody wants
+    the reply, which saves making the future), and run() works through the actors
+    with messages waiting, round robin, up to quantum messages per actor per turn.
+
+    Methods can be coroutine functions. While one is being awaited its actor is busy:
+    the rest of its mailbox waits, as it would for a synchronous method, but every
+    other actor carries on. A coroutine method that awaits a reply from its own object
+    will therefore wait forever.
+
+    Objects that aren't listening keep their messages queued until listen() is called.
+
+    An exception raised handling a message sent with tell() has nowhere to go, so it's
+    passed to the event loop's exception handler. An object's actor is dropped once its
+    mailbox is empty and nothing of its is running, so the scheduler only keeps alive
+    objects that still have messages coming.
+"""
+
+import asyncio
+from collections import deque
+from functools import partial
+from inspect import isawaitable
+
+from gloom import clock
+from gloom.mailbox import Mailbox
+from gloom.message import GloomMessage
+
+
+class Actor:
+
+    __slots__ = ("object", "mailbox", "scheduled", "busy")
+
+    def __init__(self, o):
+        self.object = o
+        # (message, future) pairs, oldest first
+        self.mailbox = Mailbox()
+        self.scheduled = False
+        self.busy = False
+
+
+    def __repr__(self):
+        return f"Actor({self.object.name!r}, {len(self.mailbox)} queued)"
+
+
+class Scheduler:
+
+    def __init__(self, quantum=1):
+        self.quantum = quantum
+        self.actors = {}
+        self.ready = deque()
+        self.busy = 0
+        self.delivered = 0
+        self.stopped = False
+        self.wakeup = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+
+    def __repr__(self):
+        return f"Scheduler(actors={len(self.actors)}, ready={len(self.ready)}, busy={self.busy}, delivered={self.delivered})"
+
+
+    def actor(self, o):
+        if (actor := self.actors.get(o)) is None:
+            actor = self.actors[o] = Actor(o)
+        return actor
+
+
+    def send(self, o, message):
+        """ Queue message for o, returning a future for its reply. Must be called with
+            the event loop running.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if type(message) is GloomMessage:
+            message.sent_at = clock.now()
+        actor = self.actor(o)
+        actor.mailbox.append((message, future))
+        self.schedule(actor)
+        return future
+
+
+    def tell(self, o, message):
+        """ Queue message for o, dropping whatever it replies """
+        if type(message) is GloomMessage:
+            message.sent_at = clock.now()
+        actor = self.actor(o)
+        actor.mailbox.append((message, None))
+        self.schedule(actor)
+
+
+    def listen(self, o):
+        """ Start delivering to o, including anything sent while it wasn't listening """
+        o.listen()
+        self.schedule(self.actor(o))
+
+
+    def schedule(self, actor):
+        if actor.scheduled or actor.busy or not actor.mailbox or not actor.object.listening:
+            return
+        actor.scheduled = True
+        self.ready.append(actor)
+        self.idle.clear()
+        self.wakeup.set()
+
+
+    def turn(self, actor):
+        """ Deliver up to quantum of actor's messages """
+        actor.scheduled = False
+        o = actor.object
+        if not o.listening:
+            return
+        mailbox = actor.mailbox
+        handle = o.handle_message
+        for _ in range(self.quantum):
+            if not mailbox:
+                break
+            message, future = mailbox.popleft()
+            if future is not None and future.cancelled():
+                continue
+            self.delivered += 1
+            try:
+                reply = handle(message)
+            except Exception as e:
+                if future is not None:
+                    future.set_exception(e)
+                else:
+                    self.report(e, o, message)
+                continue
+            if isawaitable(reply):
+                actor.busy = True
+                self.busy += 1
+                task = asyncio.ensure_future(reply)
+                task.add_done_callback(partial(self.finished, actor, message, future))
+                return
+            if future is not None:
+                future.set_result(reply)
+        self.settle(actor)
+
+
+    def settle(self, actor):
+        """ Schedule actor's next turn, or forget it if it has nothing left to do """
+        self.schedule(actor)
+        if not (actor.scheduled or actor.busy or actor.mailbox) and self.actors.get(actor.object) is actor:
+            del self.actors[actor.object]
+
+
+    def report(self, e, o, message):
+        """ Pass on an exception nobody is waiting for """
+        asyncio.get_running_loop().call_exception_handler({
+            "message": f"{o.name!r} raised handling {message!r}",
+            "exception": e,
+        })
+
+
+    def finished(self, actor, message, future, task):
+        """ A coroutine method is done: pass on how it went and free up its actor """
+        actor.busy = False
+        self.busy -= 1
+        if future is None:
+            if not task.cancelled() and (e := task.exception()) is not None:
+                self.report(e, actor.object, message)
+        elif not future.cancelled():
+            if task.cancelled():
+                future.cancel()
+            elif (e := task.exception()) is not None:
+                future.set_exception(e)
+            else:
+                future.set_result(task.result())
+        self.settle(actor)
+        if not self.ready and not self.busy:
+            self.idle.set()
+
+
+    async def run(self):
+        """ Deliver messages until stop() is called """
+        self.stopped = False
+        ready = self.ready
+        while not self.stopped:
+            if not ready:
+                if not self.busy:
+                    self.idle.set()
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            # one turn for every actor that was ready at the start of the round, then
+            # let everything else on the loop (coroutine methods, senders) have a go
+            for _ in range(len(ready)):
+                self.turn(ready.popleft())
+            await asyncio.sleep(0)
+
+
+    def stop(self):
+        self.stopped = True
+        self.wakeup.set()
+
+
+    async def join(self):
+        """ Wait until every queued message has been handled """
+        await self.idle.wait()
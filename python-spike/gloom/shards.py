@@ -0,0 +1,338 @@
+""" Running one object space across several processes, to get past the GIL.
+
+    A ShardedRuntime starts N worker processes and splits locations between them with
+    owner(): integer locations (GloomPointers included) by value mod N, anything else
+    by a CRC of its str. Each worker keeps the objects it owns in a ShardHub of its own
+    and handles every message sent to them.
+
+    The runtime talks to each worker over a Pipe, in batches: send_many() groups its
+    messages by shard, writes every shard's batch before reading any replies, so the
+    workers get through their batches at the same time. Batches, and the replies that
+    come back, are pickled. A reply that's a GloomObject comes back as a RemoteObject,
+    inside lists, tuples, sets and dicts too. A RemoteObject routes through whichever
+    process unpickles it: passed to a worker in a message, it sends through that
+    worker's ShardHub.
+
+    Dereferencing a location another shard owns, the runtime's or a worker's, gives a
+    RemoteObject, which sends on to the owner. Sent from the runtime, a RemoteObject's
+    messages are answered straight away. Sent from inside a worker they can't be (the
+    owner may be busy waiting on this very worker), so they're forwarded: queued, handed
+    back to the runtime with the current batch's replies, and delivered by the runtime
+    in a later batch, by deliver_forwarded().
+
+    That makes cross-shard sends from inside a worker one way, not transparent: there
+    RemoteObject.send returns None straight away, and whatever the owner replies once
+    the message is delivered is dropped. Methods that need an answer from another shard
+    have to be driven from the runtime instead.
+"""
+
+import multiprocessing
+import os
+from zlib import crc32
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def owner(location, shards):
+    """ The index of the shard location lives in """
+    if isinstance(location, int):
+        return location % shards
+    return crc32(str(location).encode()) % shards
+
+
+class RemoteObject:
+    """ A stand-in for an object living in another shard """
+
+    __slots__ = ("router", "location")
+
+    def __init__(self, router, location):
+        self.router = router
+        self.location = location
+
+
+    def __repr__(self):
+        return f"RemoteObject(location={self.location!r})"
+
+
+    def __eq__(self, other):
+        return isinstance(other, RemoteObject) and other.location == self.location
+
+
+    def __hash__(self):
+        return hash(self.location)
+
+
+    def __reduce__(self):
+        # the router stays behind, whoever unpickles it gets this process's
+        return remote, (self.location,)
+
+
+    def send(self, message):
+        return self.router.route(self.location, message)
+
+
+# What RemoteObjects unpickled in this process route through: a worker's ShardHub, or
+# None in the runtime's process, where request_many plugs itself into its replies
+router = None
+
+
+def remote(location):
+    return RemoteObject(router, location)
+
+
+class ShardHub(GloomHub):
+    """ The objects one worker owns. Locations owned by other shards read as RemoteObjects,
+        and addresses are allocated from this shard's share of them.
+    """
+
+    def __init__(self, index, shards):
+        super().__init__()
+        self.index = index
+        self.shards = shards
+        # (location, message) sent to other shards, for the runtime to deliver
+        self.forwarded = []
+
+
+    def owns(self, location):
+        return owner(location, self.shards) == self.index
+
+
+    def route(self, location, message):
+        if self.owns(location):
+            return self.objects[location].send(message)
+        self.forwarded.append((location, message))
+
+
+    def allocate(self):
+        while (address := self.addresses.allocate() * self.shards + self.index) in self.objects:
+            pass
+        return address
+
+
+    def vacated(self, key):
+        if isinstance(key, int) and not isinstance(key, bool) and key >= 0 and self.owns(key):
+            self.addresses.release(int(key) // self.shards)
+
+
+    def compactable(self, key):
+        return super().compactable(key) and self.owns(key)
+
+
+    def nth_address(self, n):
+        # compacting stays within this shard's share: index, index + shards, ...
+        return n * self.shards + self.index
+
+
+    def get(self, location, default=None):
+        if not self.owns(location):
+            return RemoteObject(self, location)
+        return self.objects.get(location, default)
+
+
+    def __getitem__(self, key):
+        if not self.owns(key):
+            return RemoteObject(self, key)
+        return self.objects[key]
+
+
+def portable(reply):
+    """ What a reply turns into to leave the worker, containers included """
+    if isinstance(reply, GloomObject):
+        return RemoteObject(None, reply.location)
+    if type(reply) in (list, tuple, set, frozenset):
+        return type(reply)(portable(item) for item in reply)
+    if type(reply) is dict:
+        return {portable(key): portable(value) for key, value in reply.items()}
+    return reply
+
+
+def routed(reply, router):
+    """ Plug router into every RemoteObject in reply, containers included """
+    if isinstance(reply, RemoteObject):
+        reply.router = router
+    elif type(reply) in (list, tuple, set, frozenset):
+        for item in reply:
+            routed(item, router)
+    elif type(reply) is dict:
+        for key, value in reply.items():
+            routed(key, router)
+            routed(value, router)
+    return reply
+
+
+def serve(connection, index, shards, setup):
+    """ A worker: handle batches of requests from the runtime until told to stop """
+    global router
+    hub = router = ShardHub(index, shards)
+    if setup is not None:
+        setup(hub)
+    while True:
+        batch = connection.recv()
+        if batch is None:
+            break
+        replies = []
+        for request in batch:
+            try:
+                replies.append(portable(handle(hub, request)))
+            except Exception as e:
+                replies.append(Failure(e))
+        try:
+            connection.send((replies, hub.forwarded))
+        except Exception as e:
+            # nothing was written, so answer every request rather than leave the
+            # runtime waiting on this pipe
+            failure = Failure(RuntimeError(f"couldn't send replies back: {e!r}"))
+            connection.send(([failure] * len(replies), []))
+        hub.forwarded = []
+    connection.close()
+
+
+def handle(hub, request):
+    kind, location, argument = request
+    if kind == "send":
+        return hub.objects[location].send(argument)
+    if kind == "create":
+        return GloomObject(location=location, heap=hub, **argument).location
+    if kind == "size":
+        return len(hub)
+    raise ValueError(f"no idea what a {kind!r} request is")
+
+
+class Failure:
+    """ An exception raised handling a request, shipped back to be raised again """
+
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+    def __reduce__(self):
+        return Failure, (self.error,)
+
+
+class ShardedRuntime:
+
+    def __init__(self, workers=None, setup=None, context=None):
+        """ Start workers processes (one per core by default). setup, if given, is called
+            with each worker's ShardHub before it handles anything, and has to be
+            picklable if the start method isn't fork.
+        """
+        self.shards = workers or os.cpu_count() or 1
+        context = context or multiprocessing.get_context()
+        self.connections = []
+        self.processes = []
+        for index in range(self.shards):
+            here, there = context.Pipe()
+            process = context.Process(target=serve, args=(there, index, self.shards, setup), daemon=True)
+            process.start()
+            there.close()
+            self.connections.append(here)
+            self.processes.append(process)
+        self.forwarded = []
+
+
+    def __repr__(self):
+        return f"ShardedRuntime(shards={self.shards})"
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def owner(self, location):
+        return owner(location, self.shards)
+
+
+    def request_many(self, requests):
+        """ Run (kind, location, argument) requests on their owning shards, returning
+            their replies in order. Every shard gets its batch before any replies are read.
+        """
+        batches = [[] for _ in range(self.shards)]
+        positions = [[] for _ in range(self.shards)]
+        for position, request in enumerate(requests):
+            index = self.owner(request[1])
+            batches[index].append(request)
+            positions[index].append(position)
+
+        for connection, batch in zip(self.connections, batches):
+            if batch:
+                connection.send(batch)
+        results = [None] * len(requests)
+        for connection, batch, where in zip(self.connections, batches, positions):
+            if not batch:
+                continue
+            replies, forwarded = connection.recv()
+            self.forwarded.extend(forwarded)
+            for position, reply in zip(where, replies):
+                results[position] = reply
+
+        for reply in results:
+            if isinstance(reply, Failure):
+                raise reply.error
+            routed(reply, self)
+        return results
+
+
+    def create(self, location, **fields):
+        """ Make a GloomObject at location in the shard that owns it. fields are passed on
+            to GloomObject, so methods have to be picklable (module level functions).
+        """
+        return self.request_many([("create", location, fields)])[0]
+
+
+    def send(self, location, message):
+        return self.send_many([(location, message)])[0]
+
+
+    def send_many(self, sends):
+        """ Send every (location, message) to its owner, returning the replies in order """
+        return self.request_many([("send", location, message) for location, message in sends])
+
+
+    def route(self, location, message):
+        return self.send(location, message)
+
+
+    def deliver_forwarded(self):
+        """ Deliver what workers forwarded, and anything that forwards, until there's
+            nothing left. Returns how many messages were delivered. Their replies are
+            dropped, the worker that sent them has long since moved on.
+        """
+        delivered = 0
+        while self.forwarded:
+            sends, self.forwarded = self.forwarded, []
+            self.send_many(sends)
+            delivered += len(sends)
+        return delivered
+
+
+    def deref(self, pointer):
+        """ The object at pointer (any location), wherever it lives """
+        return RemoteObject(self, pointer)
+
+
+    def sizes(self):
+        """ How many objects each shard holds """
+        return [
+            self.request_many([("size", index, None)])[0]
+            for index in range(self.shards)
+        ]
+
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
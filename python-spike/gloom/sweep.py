@@ -0,0 +1,102 @@
+""" Incremental, generational sweeping of cold objects out of a hub.
+
+    An object is cold once it has at most threshold references and hasn't been
+    referenced for max_age, in the current clock's units (nanoseconds for the default
+    MonotonicClock, ticks for a TickClock). A Sweeper walks its hub a slice at a time:
+    step() returns as soon as its time budget is spent, so an interpreter can sweep a
+    large heap between messages without ever stopping for long.
+
+    Objects that survive a pass move up a generation, and generation n is only looked
+    at every 2**n passes. Objects that have stayed warm for a while tend to stay warm,
+    so most of each pass goes to young ones. An object's generation is kept on the
+    object, so it moves with it and isn't inherited by whatever reuses its address.
+
+    A pass walks the hub's listing() (its keys in a list it keeps up to date) by index,
+    rather than a snapshot of its keys, so a step only pays for the objects it visits
+    and a pass for the objects there are. Keys added mid-pass go on the end and are
+    seen by the same pass.
+"""
+
+from time import perf_counter
+
+from gloom import clock
+
+
+class Sweeper:
+
+    def __init__(self, hub, max_age, threshold=0, budget=0.001, generations=4):
+        self.hub = hub
+        hub.listing()
+        self.max_age = max_age
+        self.threshold = threshold
+        self.budget = budget
+        self.oldest = generations - 1
+        self.passes = 0
+        # the next address to visit, None between passes
+        self.cursor = None
+        self.now = None
+        self.freed = 0
+
+
+    def __repr__(self):
+        return f"Sweeper(passes={self.passes}, freed={self.freed})"
+
+
+    def start(self):
+        self.cursor = 0
+        self.now = clock.now()
+
+
+    def finish(self):
+        self.cursor = None
+        self.passes += 1
+
+
+    def step(self, budget=None):
+        """ Sweep for up to budget seconds (the sweeper's own budget by default), visiting
+            at least one object. Returns True when that finished a pass.
+        """
+        if self.cursor is None:
+            self.start()
+        deadline = perf_counter() + (self.budget if budget is None else budget)
+        hub = self.hub
+        objects = hub.objects
+        passes = self.passes
+        cutoff = self.now - self.max_age
+        i = self.cursor
+        # free_all() starts a new list, so look it up every time
+        while i < len(listed := hub.listed):
+            location = listed[i]
+            i += 1
+            if (value := objects.get(location)) is None:
+                continue
+            try:
+                references, last_referenced = value.references, value.last_referenced
+                generation = value.generation
+            except AttributeError:
+                continue
+            if not passes % (1 << generation):
+                if references <= self.threshold and last_referenced <= cutoff:
+                    if hub.discard(location, value):
+                        # the last key took its place, and hasn't been visited yet
+                        i -= 1
+                        self.freed += 1
+                elif generation < self.oldest:
+                    value.generation = generation + 1
+            if perf_counter() >= deadline:
+                break
+        self.cursor = i
+        if i >= len(hub.listed):
+            self.finish()
+            return True
+        return False
+
+
+    def run(self):
+        """ Finish the pass in progress, or do a whole one, without stopping. Returns how
+            many objects it freed.
+        """
+        freed = self.freed
+        while not self.step(float("inf")):
+            pass
+        return self.freed - freed
@@ -0,0 +1,76 @@
+import pytest
+
+from gloom.gloom import GloomAffinity, GloomObject, GloomPointer
+from gloom.hub import GloomHub
+
+
+def test_pointers_are_values():
+    pointer = GloomPointer(3)
+    assert pointer == GloomPointer(3) == 3 and hash(pointer) == hash(3)
+    assert (pointer.value, repr(pointer), str(pointer)) == (3, "GloomPointer(value=3)", "ref#3")
+    assert pointer.affinity is GloomAffinity.REFERENCE
+    with pytest.raises(AttributeError):
+        pointer.value = 4
+
+
+def test_hub_finds_objects_by_pointer_or_address():
+    hub = GloomHub()
+    o = GloomObject(location=GloomPointer(7), heap=hub)
+    assert hub[7] is hub[GloomPointer(7)] is hub.get(GloomPointer(7)) is o
+    o.move(GloomPointer(8))
+    assert 7 not in hub and hub[8] is o and len(hub) == 1
+
+
+def test_allocate_recycles_and_skips_taken_addresses():
+    hub = GloomHub()
+    GloomObject(location=1, heap=hub)
+    assert [hub.allocate(), hub.allocate()] == [0, 2]
+    hub.release(0)
+    assert hub.allocate() == 0
+
+
+def test_objects_without_a_location_get_fresh_addresses():
+    hub = GloomHub()
+    objects = [GloomObject(heap=hub) for _ in range(3)]
+    assert [o.location for o in objects] == [0, 1, 2] and len(hub) == 3
+
+    objects[0].free()
+    objects[1].move(10)
+    assert GloomObject(heap=hub).location == 0
+    assert GloomObject(heap=hub).location == 1
+    assert GloomObject(heap=hub).location == 3
+
+
+
+
+def test_freeing_a_stale_handle_leaves_the_new_owner_alone():
+    hub = GloomHub()
+    a = GloomObject(heap=hub)
+    a.free()
+    a.free()
+    b = GloomObject(heap=hub)
+    assert b.location == a.location == 0
+    a.free()
+    assert hub.get(b.location) is b and len(hub) == 1
+
+    hub.free_all()
+    c = GloomObject(heap=hub)
+    assert c.location == b.location
+    b.free()
+    assert hub.get(c.location) is c and GloomObject(heap=hub).location == 1
+def test_compact_moves_objects_into_a_dense_range():
+    hub = GloomHub()
+    first = GloomObject(location=GloomPointer(4), heap=hub)
+    second = GloomObject(location=9, heap=hub)
+    hub.store("name", second)
+    elsewhere = GloomObject(heap=GloomHub())
+    hub.store(12, elsewhere)
+
+    assert hub.compact() == {4: 0, 9: 1, 12: 2}
+    assert (first.location, second.location) == (GloomPointer(0), 1)
+    assert type(first.location) is GloomPointer
+    assert hub[0] is first and hub[1] is second and hub[2] is elsewhere and hub["name"] is second
+    # compacting isn't a use, so it leaves reference counts alone
+    assert first.references == second.references == 0 and elsewhere.location == 0
+    assert hub.global_references == sum(o.references for o in hub.objects.values())
+    assert GloomObject(heap=hub).location == 3
@@ -0,0 +1,44 @@
+from gloom.cache import ParseCache
+from gloom.parser import Parser
+
+
+PROGRAM = """
+    :set x :to #(1 2 3 #(4.0 5)).
+    :set y :to (x :at 2).
+    ((1 + 2) * 3) :print.
+    y :print.
+    """
+
+
+def test_second_parse_is_a_hit_and_skips_the_parser(monkeypatch):
+    cache = ParseCache()
+    first = cache.parse(PROGRAM)
+
+    def explode(*args, **kwargs):
+        raise AssertionError("parsed a cached program")
+    monkeypatch.setattr(Parser, "parse_program", explode)
+
+    second = cache.parse(PROGRAM)
+    assert repr(first) == repr(second)
+    assert first[0] is not second[0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_cache_survives_a_new_cache_and_misses_on_changed_source(tmp_path):
+    ParseCache(directory=tmp_path).parse(PROGRAM)
+
+    cache = ParseCache(directory=tmp_path)
+    assert repr(cache.parse(PROGRAM)) == repr(Parser().parse(PROGRAM))
+    assert (cache.disk_hits, cache.misses) == (1, 0)
+
+    cache.parse(PROGRAM + "2 :print.")
+    assert cache.misses == 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_lru_evicts_the_least_recently_used_program():
+    cache = ParseCache(maxsize=2)
+    for program in ("1 :print.", "2 :print.", "1 :print.", "3 :print.", "1 :print."):
+        cache.parse(program)
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert len(cache) == 2
@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+
+from gloom import clock
+from gloom.gloom import GloomObject, ref
+
+
+@ref
+def touch(self):
+    pass
+
+
+def test_tick_clock_stamps_creation_and_references():
+    previous = clock.use(clock.TickClock())
+    try:
+        o = GloomObject()
+        assert o.created_at == o.updated_at == o.last_referenced
+        touch(o)
+        touch(o)
+        assert o.references == 2
+        assert o.last_referenced == o.created_at + 2
+        assert f"last referenced: tick {o.last_referenced}" in o.safe_repr()
+    finally:
+        clock.use(previous)
+
+
+def test_monotonic_stamps_display_as_wall_time():
+    o = GloomObject()
+    assert isinstance(o.created_at, int)
+    assert abs(clock.display(o.created_at) - datetime.now()) < timedelta(seconds=5)
@@ -0,0 +1,62 @@
+from gloom.columns import ColumnarHub
+from gloom.gloom import GloomAffinity, GloomObject
+from gloom.hub import GloomHub
+
+
+def summed(hub):
+    return sum(o.references for o in hub.objects.values())
+
+
+def test_members_are_views_onto_the_columns():
+    heap = ColumnarHub()
+    o = GloomObject(location=1, heap=heap, affinity=GloomAffinity.SOMETHING)
+    assert o._slot == 0 and heap.members == 1
+
+    repr(o)
+    o.references += 2
+    o.affinity = GloomAffinity.EVERYTHING
+    assert heap.reference_counts[0] == o.references == 3
+    assert heap.affinities[0] == list(GloomAffinity).index(GloomAffinity.EVERYTHING)
+    assert heap.referenced[0] == o.last_referenced
+    assert o.is_everything and heap.global_references == 3
+
+
+def test_ref_all_keeps_every_total_consistent():
+    heap, other = ColumnarHub(), GloomHub()
+    members = [GloomObject(location=location, heap=heap) for location in range(5)]
+    members[0].free()
+    other.store("shared", members[1])
+    guest = GloomObject(heap=GloomHub())
+    heap.store("guest", guest)
+
+    heap.ref_all()
+    assert [o.references for o in members[1:]] == [1, 1, 1, 1]
+    assert guest.references == 1 and members[0].references == 0
+    assert heap.global_references == summed(heap) == 5
+    assert other.global_references == summed(other) == 1
+    assert guest.objects.global_references == 1
+
+
+def test_moving_out_gives_an_object_its_fields_back_and_snapshots_are_copies():
+    heap = ColumnarHub()
+    o = GloomObject(location=1, heap=heap)
+    o.references = 4
+    snapshot = heap.snapshot()
+
+    o.move(2)
+    assert o._slot == 0 and o.references == 6
+    heap.free_location(2)
+    assert o._slot is None and o.references == 6 and heap.free_slots == [0]
+    assert (snapshot.size, snapshot.total_references) == (1, 4)
+    assert heap.snapshot().total_references == 0
+
+
+def test_objects_without_a_location_get_an_address_and_a_slot():
+    heap = ColumnarHub()
+    o = GloomObject(heap=heap)
+    clone = o.clone_to(None)
+    assert (o.location, clone.location) == (0, 1)
+    assert (o._slot, clone._slot) == (0, 1) and heap.members == 2
+
+    o.free()
+    assert heap.free_slots == [0] and GloomObject(heap=heap).location == 0
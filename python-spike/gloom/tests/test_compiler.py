@@ -0,0 +1,60 @@
+from gloom.compiler import Opcode, VM, compile_program
+from gloom.gloom import GloomObject
+from gloom.parser import ObjectNode, Parser
+
+from gloom.tests.test_parser import PROGRAM
+
+
+def test_vm_gives_the_same_results_as_walking_the_tree():
+    environment = GloomObject()
+    for statement in Parser().parse(PROGRAM):
+        bytecode = compile_program([statement])
+        expected = statement.evaluate(environment)
+        assert repr(VM().run(bytecode, environment)) == repr(expected)
+    assert environment.stack == []
+    environment.free_all()
+
+
+def run_both(program, names):
+    """ (tree walker's results, VM's results) for every statement, each from a fresh
+        environment with names set in it
+    """
+    results = []
+    for run in (
+        lambda statement, environment: statement.evaluate(environment),
+        lambda statement, environment: VM().run(compile_program([statement]), environment),
+    ):
+        environment = GloomObject()
+        for name, value in names.items():
+            environment.names[name] = ObjectNode(*value)
+        results.append([repr(run(statement, environment)) for statement in Parser().parse(program)])
+        environment.free_all()
+    return results
+
+
+def test_vm_and_tree_walker_resolve_names_the_same_way():
+    names = {"x": (3.0, "number"), "y": (4.0, "number")}
+    for program in (
+        PROGRAM,
+        "(1 + x) :print. (2 * y) :print. #(x 1 'a') :print. :set z :to x.",
+        "(3 + z) :at 1.",
+    ):
+        walked, ran = run_both(program, names)
+        assert walked == ran
+    assert run_both("(1 + x) :print.", names) == [["Object(4.0, number)"]] * 2
+
+
+def test_compiler_interns_constants_and_prebuilds_fixed_payloads():
+    bytecode = compile_program(Parser().parse("(1 + 2) + 1. 2 + 1. :set y :to x."))
+    assert bytecode.constants == [(1.0, "number"), (2.0, "number")]
+    assert len(bytecode.payloads) == 2
+    assert bytecode.selectors == [("set", "to")]
+    assert list(bytecode.code[-4:]) == [Opcode.SEND, 0, Opcode.POP, 0]
+
+
+def test_vm_does_not_mutate_the_program():
+    bytecode = compile_program(Parser().parse("((1 + 2) * 3) :print."))
+    environment = GloomObject()
+    assert VM().run(bytecode, environment).value == 9
+    assert VM().run(bytecode, environment).value == 9
+    environment.free_all()
@@ -0,0 +1,125 @@
+import pickle
+
+from gloom import dispatch
+from gloom.compiler import compile_program
+from gloom.dispatch import CallSite, MethodTable, Shape, binary_selector, intern_selector
+from gloom.gloom import GloomObject, use_everything
+from gloom.hub import GloomHub
+from gloom.parser import ObjectNode, Parser
+
+
+def test_selectors_are_interned_once_per_shape():
+    assert intern_selector(("new", "location")) == "new:location"
+    assert intern_selector(("new", "location")) is intern_selector(tuple(["new", "location"]))
+    assert binary_selector("+") == "+:to"
+    assert CallSite("print").selector == "print"
+    assert CallSite(("at", "put")).selector is intern_selector(("at", "put"))
+
+
+def test_cached_method_is_dropped_when_the_table_changes():
+    o = GloomObject()
+    o.methods["add:to"] = lambda self, add, to: add + to
+    assert o.send({"add": 1, "to": 2}) == 3
+
+    o.methods["add:to"] = lambda self, add, to: add * to
+    assert o.send({"add": 3, "to": 2}) == 6
+
+    del o.methods["add:to"]
+    assert o.send({"add": 3, "to": 2}) is None
+
+
+def test_call_site_keeps_several_tables_and_notices_changes():
+    site = CallSite("size")
+    tables = [MethodTable(size=lambda self, n=n: n) for n in range(CallSite.POLYMORPHIC_LIMIT)]
+    shapes = [table.shape(None) for table in tables]
+    for shape in shapes:
+        site.lookup(shape)
+    assert len(site.others) == CallSite.POLYMORPHIC_LIMIT - 1
+
+    tables[0]["size"] = lambda self: "changed"
+    assert shapes[0].epoch == Shape.RETIRED and tables[1].shape(None) is shapes[1]
+    assert site.lookup(tables[0].shape(None))(None) == "changed"
+    assert site.lookup(shapes[1])(None) == 1
+    # only the retired shape is forgotten, the others are still cached
+    assert len(site.others) == CallSite.POLYMORPHIC_LIMIT - 1
+    assert all(shape.epoch != Shape.RETIRED for shape, _ in site.others)
+
+
+def test_new_objects_and_reads_leave_other_caches_alone():
+    o = GloomObject(methods={"size": lambda self: 1})
+    shape = o.shape
+    site = CallSite("size")
+    assert o.perform(site) == 1
+
+    GloomObject(methods={"size": lambda self: 2})
+    GloomObject().methods
+    assert o.shape is shape and shape.epoch == dispatch.epoch
+    assert site.lookup(shape) is site.method
+
+    template = GloomObject()
+    clone = template.clone_to(None)
+    assert clone.send("size") is None
+    template.methods["size"] = lambda self: 3
+    assert clone.send("size") == 3 and o.shape is shape
+
+
+def test_binary_unary_and_perform():
+    o = GloomObject(methods={"+:to": lambda self, value: value + 1, "name": lambda self: self.name})
+    assert isinstance(o.methods, MethodTable)
+    assert o.send(("+", 4)) == 5
+    assert o.send("name") == "anonymous"
+    assert o.perform(CallSite("name")) == "anonymous"
+
+    clone = GloomObject()
+    clone.methods = o.methods
+    assert clone.methods is o.methods
+
+
+def test_methods_delegate_up_the_prototype_chain_to_everything():
+    heap = GloomHub()
+    everything = GloomObject(name="everything", heap=heap, methods={"kind": lambda self: "anything"})
+    previous = use_everything(everything)
+    try:
+        template = GloomObject(name="point", heap=heap, methods={"x": lambda self: 0})
+        a, b = template.clone_to(None), template.clone_to(None)
+        assert a.shape is b.shape is template.shape
+        assert a.send("x") == 0 and a.send("kind") == "anything"
+        assert GloomObject(heap=heap).send("kind") == "anything"
+
+        a.methods["x"] = lambda self: 1
+        assert a.shape is not b.shape and a.shape.parent is template.shape
+        assert (a.send("x"), b.send("x")) == (1, 0)
+
+        everything.methods["kind"] = lambda self: "everything"
+        assert a.clone_to(None).send("kind") == "everything"
+    finally:
+        use_everything(previous)
+    assert a.send("kind") is None
+
+
+def test_sends_from_compiled_code_go_through_call_sites():
+    bytecode = compile_program(Parser().parse(":set y :to 1. :at 1 :put 2."))
+    site = bytecode.sites[0]
+    assert site.selector == "set:to" and bytecode.payload_sites[0].selector == "at:put"
+
+    o = GloomObject(methods={"set:to": lambda self, set, to: to.value + 1})
+    assert o.send({"set": None, "to": ObjectNode(1.0, "number")}, site) == 2
+    assert site.method is not None
+
+    o.methods |= {"set:to": lambda self, set, to: to.value * 10}
+    assert o.send({"set": None, "to": ObjectNode(2.0, "number")}, site) == 20
+    # the tree walker passes its environment in the site's place
+    assert o.send({"set": None, "to": ObjectNode(3.0, "number")}, GloomObject()) == 30
+
+
+def size(self):
+    return 1
+
+
+def test_method_tables_survive_pickling():
+    table = MethodTable(size=size)
+    table.shape(None)
+    copy = pickle.loads(pickle.dumps(table))
+    assert type(copy) is MethodTable and copy == table and copy.shapes is None
+    copy["size"] = lambda self: 2
+    assert table["size"] is size
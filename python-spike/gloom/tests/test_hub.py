@@ -0,0 +1,95 @@
+import io
+from math import isclose
+
+import pytest
+
+from gloom.gloom import GloomObject, refall, refmany
+from gloom.hub import GloomHub
+
+
+def summed(hub):
+    return sum(o.references for o in hub.objects.values())
+
+
+def test_running_total_follows_references_stores_moves_and_frees():
+    hub = GloomHub()
+    first = GloomObject(location=1, heap=GloomHub())
+    second = GloomObject(location=2, heap=GloomHub())
+    hub.store(1, first)
+    hub[2] = second
+
+    first.references += 3
+    repr(second)
+    assert hub.global_references == summed(hub) == 4
+    assert isclose(first.popularity_score, 3 / first.global_references())
+
+    hub.store(1, second)
+    assert hub.global_references == summed(hub) == 2
+
+    hub.free_location(2)
+    del hub[1]
+    assert hub.global_references == 0
+    assert first.tallies == (first.objects.tally,) and second.tallies == (second.objects.tally,)
+
+
+def test_moving_an_object_keeps_its_own_hub_total():
+    o = GloomObject(location=1, heap=GloomHub())
+    o.move(2)
+    assert 2 in o.objects and 1 not in o.objects
+    assert o.global_references() == o.references == 2
+
+
+def test_repr_references_everything_once():
+    hub = GloomHub()
+    for location in range(3):
+        GloomObject(location=location, heap=hub)
+    repr(hub)
+    assert [o.references for o in hub.objects.values()] == [1, 1, 1]
+    assert hub.global_references == 3
+
+
+
+def test_ref_many_and_ref_all_keep_the_running_total():
+    hub = GloomHub()
+    objects = [GloomObject(location=location, heap=hub) for location in range(3)]
+    hub.store("again", objects[0])
+
+    hub.ref_many(location for location in (0, 0, 2))
+    assert [o.references for o in objects] == [2, 0, 1]
+    assert hub.global_references == summed(hub)
+
+    hub.ref_all()
+    assert [o.references for o in objects] == [3, 1, 2]
+    assert hub.global_references == summed(hub)
+    assert objects[1].last_referenced > objects[1].created_at
+
+
+def test_refmany_and_refall_use_the_shared_heap():
+    heap = GloomObject.objects
+    o = GloomObject(location="refmany")
+    try:
+        refmany(iter(["refmany"]))
+        refall()
+        assert o.references == 2
+        with pytest.raises(KeyError):
+            refmany(["nowhere"])
+    finally:
+        heap.free_location("refmany")
+
+
+def test_streamed_repr_matches_repr_and_samples():
+    hub = GloomHub()
+    objects = [GloomObject(location=location, heap=hub) for location in range(10)]
+    chunks = list(hub.iter_repr())
+    assert chunks[0] == "\t" and len(chunks) == 11
+    assert chunks[3].startswith("2 : \n        gloom object @2")
+    assert [o.references for o in objects] == [1] * 10
+
+    out = io.StringIO()
+    assert hub.write_repr(out, batch=3) == 10
+    assert out.getvalue().count("gloom object @") == 10
+
+    sampled = list(hub.iter_repr(limit=2, every=3))
+    assert [chunk.split(" : ")[0] for chunk in sampled[1:]] == ["0", "3"]
+    assert [o.references for o in objects[:4]] == [3, 2, 2, 3]
+    assert hub.global_references == summed(hub)
@@ -0,0 +1,66 @@
+import pytest
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.mailbox import Mailbox, MailboxFull, Overflow
+
+
+def recorder(heap, **mailbox):
+    o = GloomObject(heap=heap, methods={"n": lambda self, n: n})
+    o.inbox = Mailbox(**mailbox)
+    o.listening = False
+    return o
+
+
+def test_queued_messages_are_received_oldest_first():
+    o = recorder(GloomHub())
+    for n in range(5):
+        assert o.send({"n": n}) is None
+    assert len(o.inbox) == 5
+
+    assert o.receive() == 0
+    assert o.receive_batch(2) == [1, 2]
+    assert o.drain() == [3, 4]
+    assert o.receive() is None and o.drain() == []
+
+    o.send({"n": 5})
+    o.listening = True
+    # a listening object catches up on its backlog before replying to the new message
+    assert o.send({"n": 6}) == 6 and not o.inbox
+
+
+def test_high_water_mark_blocks_drops_or_reports():
+    heap = GloomHub()
+    blocking = recorder(heap, high_water=2)
+    replies = []
+    blocking.methods["n"] = lambda self, n: replies.append(n)
+    for n in range(2):
+        blocking.send({"n": n})
+    # it isn't listening, so blocking can't deliver to make room
+    with pytest.raises(MailboxFull) as full:
+        blocking.send({"n": 2})
+    assert full.value.message == {"n": 2} and replies == []
+    assert list(blocking.inbox) == [{"n": 0}, {"n": 1}]
+
+    # a listening sender at the mark, like a method sending to its own object, makes room
+    def send_more(self, n):
+        replies.append(n)
+        if n == 0:
+            self.send({"n": 3})
+            self.send({"n": 4})
+    blocking.methods["n"] = send_more
+    blocking.listening = True
+    blocking.send({"n": 2})
+    # what's sent while making room gets in ahead of the message that was blocked
+    assert replies == [0, 1, 3, 4, 2] and not blocking.inbox
+
+    dropping = recorder(heap, high_water=2, overflow=Overflow.DROP)
+    for n in range(4):
+        dropping.send({"n": n})
+    assert dropping.drain() == [0, 1] and dropping.inbox.dropped == 2
+
+    reporting = recorder(heap, high_water=1, overflow=Overflow.REPORT)
+    reporting.send({"n": 0})
+    with pytest.raises(MailboxFull) as full:
+        reporting.send({"n": 1})
+    assert full.value.message == {"n": 1} and reporting.drain() == [0]
@@ -0,0 +1,46 @@
+import pytest
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.mailbox import Overflow
+from gloom.message import GloomMessage, Kind
+
+
+def test_messages_are_classified_once():
+    assert repr(GloomMessage.of("size")) == "GloomMessage(unary, 'size', ())"
+    message = GloomMessage.of({"at": 1, "put": 2})
+    assert (message.kind, message.selector, message.arguments) == (Kind.KEYWORD, "at:put", (1, 2))
+    assert GloomMessage.of(("+", 3)).selector == "+:to"
+    assert GloomMessage.of(message) is message
+    with pytest.raises(TypeError):
+        GloomMessage.of(3)
+
+
+def test_messages_are_stamped_when_sent_and_read():
+    o = GloomObject(heap=GloomHub(), methods={
+        "size": lambda self: 3, "+:to": lambda self, to: to + 1, "at:put": lambda self, at, put: (at, put),
+    })
+    delivered = GloomMessage.keyword(("at", "put"), (1, 2))
+    assert o.send(delivered) == (1, 2)
+    assert delivered.created_at <= delivered.sent_at <= delivered.read_at
+    assert o.send(GloomMessage.binary("+", 1)) == 2
+
+    o.listening = False
+    queued = GloomMessage.unary("size")
+    o.send(queued)
+    assert queued.sent_at is not None and queued.read_at is None
+    assert o.receive() == 3 and queued.read_at >= queued.sent_at
+    missing = GloomMessage.of("missing")
+    o.send(missing)
+    assert o.receive() is None and missing.read_at is not None and missing.selector == "missing"
+
+
+def test_dropped_messages_are_still_stamped_as_sent():
+    o = GloomObject(heap=GloomHub(), methods={"size": lambda self: 3})
+    o.listening = False
+    o.inbox.high_water, o.inbox.overflow = 1, Overflow.DROP
+    kept, dropped = GloomMessage.unary("size"), GloomMessage.unary("size")
+    o.send(kept)
+    o.send(dropped)
+    assert list(o.inbox) == [kept] and o.inbox.dropped == 1
+    assert dropped.sent_at is not None and dropped.read_at is None
@@ -0,0 +1,52 @@
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+
+
+def test_objects_share_one_heap_and_allocate_containers_lazily():
+    heap = GloomObject.objects
+    o = GloomObject(location="shared")
+    try:
+        assert o.objects is heap and heap["shared"] is o
+        assert o._record is None and o._methods is None
+        assert o.clone_to("clone").objects is heap
+
+        o.methods["size"] = lambda self: 1
+        assert o.send("size") == 1
+        assert not o.inbox and o.names.size == 0
+    finally:
+        heap.free_location("shared")
+        heap.free_location("clone")
+
+
+def test_side_record_keeps_the_public_attributes_working():
+    o = GloomObject(heap=GloomHub())
+    assert not hasattr(o, "__dict__")
+    assert o.updated_at == o.last_referenced == o.created_at and o._record is None
+
+    repr(o)
+    assert o.last_referenced >= o.created_at and o._record is None
+    o.auto_deref = True
+    o.stack.append(1)
+    o.names["x"] = 1
+    assert (o.auto_deref, o.stack, o.names["x"], list(o.inbox)) == (True, [1], 1, [])
+
+
+def test_clones_share_until_their_methods_are_asked_for():
+    heap = GloomHub()
+    template = GloomObject(name="point", value=(0, 0), heap=heap, methods={"x": lambda self: self.value[0]})
+    clone = template.clone_to(None)
+
+    assert (clone.location, clone.name, clone.value) == (1, "point", (0, 0))
+    assert clone.value is template.value and clone._methods is None
+    assert clone.send("x") == 0
+    assert clone.references == template.references == 1
+
+    clone.methods["y"] = lambda self: self.value[1]
+    clone.methods["x"] = lambda self: "mine"
+    assert clone.send("x") == "mine" and clone.send("y") == 0
+    assert template.send("x") == 0 and template.send("y") is None
+
+    template.methods["z"] = lambda self: "template"
+    assert clone.clone_to(5).send("x") == "mine"
+    assert template.clone_to(6).send("z") == "template"
+    assert clone.inbox is not template.inbox
@@ -0,0 +1,105 @@
+from gloom.parser import Lexer, CharacterLexer, Parser, Token
+
+import io
+import pytest
+
+
+PROGRAM = """
+    :listen.
+    ((1 + 2) * 3) :print.
+    :set x :to 5.
+    :set y :to x :at 6.0.
+    y :print.
+
+    :set x :to #(1 2 3 #(4.0 5)).
+    :set y :to (x :at 2).
+    y :print.
+
+    1 :times 5.
+    """
+
+
+def test_lexer_matches_character_lexer():
+    assert Lexer().lex(PROGRAM) == CharacterLexer().lex(PROGRAM)
+
+
+def test_lexer_slices_strings_numbers_and_booleans():
+    tokens = Lexer().lex("'hi there' :at 6.0. \"x\" true false truth")
+    assert tokens == [
+        (Token.STRING, "hi there"),
+        (Token.NAMED_PARAMETER, "at"),
+        (Token.NUMBER, "6.0"),
+        (Token.PERIOD, "."),
+        (Token.STRING, "x"),
+        (Token.BOOLEAN, "true"),
+        (Token.BOOLEAN, "false"),
+        (Token.OBJECT, "truth"),
+    ]
+
+
+def test_lexer_rejects_unknown_characters():
+    with pytest.raises(SyntaxError):
+        Lexer().lex("x @ y.")
+
+
+def test_iter_tokens_matches_lex_however_the_source_is_chunked():
+    tokens = Lexer().lex(PROGRAM)
+    for size in (1, 2, 3, 7, 64):
+        chunks = (PROGRAM[i:i + size] for i in range(0, len(PROGRAM), size))
+        assert list(Lexer().iter_tokens(chunks)) == tokens
+    assert list(Lexer().iter_tokens(io.StringIO(PROGRAM), chunk_size=5)) == tokens
+
+
+def test_iter_statements_yields_each_statement_before_reading_on():
+    read = []
+
+    def chunks():
+        for line in PROGRAM.splitlines(keepends=True):
+            read.append(line)
+            yield line
+
+    statements = Parser().iter_statements(chunks())
+    first = next(statements)
+    assert repr(first.arguments) == "[Argument(listen, [])]"
+    assert len(read) < 4
+
+    rest = list(statements)
+    assert repr([first] + rest) == repr(Parser().parse(PROGRAM))
+
+
+def test_iter_statements_yields_a_statement_from_the_chunk_with_its_period():
+    read = []
+
+    def chunks():
+        for chunk in ("x :print.", "y :at 6.", "0 :print.", "'hi' :print", "."):
+            read.append(chunk)
+            yield chunk
+
+    statements = Parser().iter_statements(chunks())
+    assert repr(next(statements).arguments) == "[Argument(print, [])]" and len(read) == 1
+    # "6." might still become "6.0", so that one waits for the next chunk
+    second = next(statements)
+    assert repr(second) == repr(Parser().parse("y :at 6.0 :print.")[0]) and len(read) == 3
+    next(statements)
+    assert len(read) == 5
+
+
+def test_iter_tokens_holds_back_only_tokens_that_could_grow():
+    program = "'hi there' :at 6.0. \"x\" true :print."
+    for size in (1, 2, 3, 5):
+        chunks = (program[i:i + size] for i in range(0, len(program), size))
+        assert list(Lexer().iter_tokens(chunks)) == Lexer().lex(program)
+
+
+def test_parser_rejects_tokens_that_cannot_follow_a_message_send():
+    with pytest.raises(SyntaxError):
+        Parser().parse("x :at 1 2.")
+    with pytest.raises(SyntaxError):
+        Parser().parse("((1 + 2) * 3")
+
+
+def test_arena_round_trips_the_program():
+    arena = Parser(Lexer().lex(PROGRAM)).parse_program(arena=True)
+    assert len(arena) == 9
+    assert repr(arena.materialize()) == repr(Parser().parse(PROGRAM))
+    assert arena.selectors.count("print") == 1
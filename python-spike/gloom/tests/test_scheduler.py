@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.scheduler import Scheduler
+
+
+def run(scenario):
+    async def main():
+        scheduler = Scheduler()
+        runner = asyncio.create_task(scheduler.run())
+        try:
+            return await scenario(scheduler)
+        finally:
+            scheduler.stop()
+            await runner
+    return asyncio.run(main())
+
+
+def test_actors_take_turns_and_replies_come_back_as_futures():
+    heap = GloomHub()
+    handled = []
+    actors = [
+        GloomObject(name=name, heap=heap, methods={"n": lambda self, n: handled.append((self.name, n)) or n})
+        for name in "ab"
+    ]
+
+    async def scenario(scheduler):
+        futures = [scheduler.send(o, {"n": n}) for o in actors for n in range(3)]
+        assert await asyncio.gather(*futures) == [0, 1, 2] * 2
+        assert scheduler.tell(actors[1], {"n": 3}) is None
+        await scheduler.join()
+        return scheduler
+
+    scheduler = run(scenario)
+    assert handled == [("a", 0), ("b", 0), ("a", 1), ("b", 1), ("a", 2), ("b", 2), ("b", 3)]
+    assert scheduler.delivered == 7
+
+
+def test_a_slow_coroutine_method_only_holds_up_its_own_actor():
+    heap = GloomHub()
+    gate = None
+    order = []
+
+    async def slow(self):
+        await gate.wait()
+        order.append("slow")
+        return "slow"
+
+    def fast(self):
+        order.append("fast")
+        return "fast"
+
+    slowpoke = GloomObject(heap=heap, methods={"go": slow})
+    other = GloomObject(heap=heap, methods={"go": fast})
+
+    async def scenario(scheduler):
+        nonlocal gate
+        gate = asyncio.Event()
+        first, second = scheduler.send(slowpoke, "go"), scheduler.send(slowpoke, "go")
+        assert await scheduler.send(other, "go") == "fast"
+        assert not first.done() and order == ["fast"]
+        gate.set()
+        assert await asyncio.gather(first, second) == ["slow", "slow"]
+        await scheduler.join()
+
+    run(scenario)
+    assert order == ["fast", "slow", "slow"]
+
+
+def test_errors_and_objects_that_are_not_listening():
+    heap = GloomHub()
+    broken = GloomObject(heap=heap, methods={"go": lambda self: 1 / 0})
+    deaf = GloomObject(heap=heap, methods={"go": lambda self: "heard"})
+    deaf.listening = False
+
+    async def scenario(scheduler):
+        with pytest.raises(ZeroDivisionError):
+            await scheduler.send(broken, "go")
+        reply = scheduler.send(deaf, "go")
+        await asyncio.sleep(0)
+        await scheduler.join()
+        assert not reply.done()
+        scheduler.listen(deaf)
+        assert await reply == "heard"
+
+    run(scenario)
+
+
+def test_told_errors_are_reported_and_idle_actors_forgotten():
+    heap = GloomHub()
+
+    async def fail(self):
+        raise ValueError("async")
+
+    broken = GloomObject(heap=heap, methods={"go": lambda self: 1 / 0, "wait": fail})
+    fine = GloomObject(heap=heap, methods={"go": lambda self: "ok"})
+
+    async def scenario(scheduler):
+        reported = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context))
+        scheduler.tell(broken, "go")
+        scheduler.tell(broken, "wait")
+        assert await scheduler.send(fine, "go") == "ok"
+        await scheduler.join()
+        await asyncio.sleep(0)
+        assert scheduler.actors == {}
+        return reported
+
+    reported = run(scenario)
+    assert [type(context["exception"]) for context in reported] == [ZeroDivisionError, ValueError]
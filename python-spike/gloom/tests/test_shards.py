@@ -0,0 +1,99 @@
+import pytest
+
+from gloom.gloom import GloomObject, GloomPointer
+from gloom.shards import RemoteObject, ShardHub, ShardedRuntime, owner
+
+
+def where(self):
+    return self.location
+
+
+def count(self, count):
+    self.value = (self.value or 0) + count
+    return self.value
+
+
+def tell(self, tell, count):
+    """ Pass count on to the object at tell, which may live in another shard """
+    return self.objects[tell].send({"count": count})
+
+
+def me(self):
+    return self
+
+
+def poke(self, poke):
+    return poke.send("where")
+
+
+def pair(self):
+    return [self, {"me": self}]
+
+
+def unpicklable(self):
+    return lambda: self
+
+
+METHODS = {
+    "where": where, "count": count, "tell:count": tell, "me": me,
+    "poke": poke, "pair": pair, "unpicklable": unpicklable,
+}
+
+
+def test_locations_are_split_between_shards():
+    assert [owner(location, 3) for location in range(6)] == [0, 1, 2, 0, 1, 2]
+    assert owner(GloomPointer(4), 3) == 1
+    assert owner("hello", 3) == owner("hello", 3)
+
+    hub = ShardHub(1, 3)
+    assert [hub.allocate() for _ in range(3)] == [1, 4, 7]
+    assert hub.get(0) == RemoteObject(None, 0) and hub.get(1) is None
+
+
+def test_compacting_a_shard_keeps_to_its_own_addresses():
+    hub = ShardHub(1, 3)
+    objects = [GloomObject(location=location, heap=hub) for location in (4, 10, 16)]
+    assert hub.compact() == {4: 1, 10: 4, 16: 7}
+    assert [o.location for o in objects] == [1, 4, 7] and hub[4] is objects[1]
+    assert hub.allocate() == 10
+
+
+def test_sends_route_to_the_owning_worker():
+    with ShardedRuntime(workers=2) as runtime:
+        for location in range(4):
+            runtime.create(location, methods=METHODS)
+        assert runtime.sizes() == [2, 2]
+        assert runtime.send_many([(location, "where") for location in range(4)]) == [0, 1, 2, 3]
+
+        pointer = runtime.deref(GloomPointer(3))
+        assert pointer.send({"count": 2}) == 2
+        assert runtime.send(1, "me") == RemoteObject(runtime, 1)
+
+        # 0 and 2 are in the same shard, 1 isn't and gets its message forwarded
+        assert runtime.send(0, {"tell": 2, "count": 5}) == 5
+        assert runtime.send(0, {"tell": 1, "count": 5}) is None
+        assert runtime.deliver_forwarded() == 1
+        assert runtime.send(1, {"count": 0}) == 5
+
+        with pytest.raises(KeyError):
+            runtime.send(5, "where")
+
+
+def test_remote_objects_route_wherever_they_end_up():
+    with ShardedRuntime(workers=2) as runtime:
+        for location in range(4):
+            runtime.create(location, methods=METHODS)
+        # 2 lives with 0 and answers, 1 doesn't and its message is forwarded
+        assert runtime.send(0, {"poke": runtime.deref(2)}) == 2
+        assert runtime.send(0, {"poke": runtime.deref(1)}) is None
+        assert runtime.deliver_forwarded() == 1
+
+        first, second = runtime.send(1, "pair")
+        assert first == second["me"] == RemoteObject(runtime, 1)
+        assert first.router is second["me"].router is runtime
+        assert first.send("where") == 1
+
+        # a reply that can't go back fails that request, and the pipes stay in step
+        with pytest.raises(RuntimeError):
+            runtime.send_many([(0, "unpicklable"), (1, "where")])
+        assert runtime.send_many([(0, "where"), (1, "where")]) == [0, 1]
@@ -0,0 +1,104 @@
+import pytest
+
+from gloom import clock
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.sweep import Sweeper
+from gloom.threadsafe import ConcurrentHub
+
+
+@pytest.fixture
+def ticks():
+    previous = clock.use(clock.TickClock())
+    yield
+    clock.use(previous)
+
+
+def test_free_all_starts_over_without_counting_freed_objects(ticks):
+    hub = GloomHub()
+    o = GloomObject(heap=hub)
+    hub.free_all()
+    repr(o)
+    assert len(hub) == 0 and hub.global_references == 0
+    assert GloomObject(heap=hub).location == 0
+
+
+def test_sweep_frees_cold_objects_and_promotes_survivors(ticks):
+    hub = GloomHub()
+    cold = [GloomObject(heap=hub) for _ in range(3)]
+    warm = GloomObject(heap=hub)
+    repr(warm)
+    sweeper = Sweeper(hub, max_age=0)
+
+    assert sweeper.run() == 3
+    assert list(hub.objects.values()) == [warm]
+    assert warm.generation == 1
+
+    # generation 1 is skipped every other pass, however cold it has become
+    warm.references = 0
+    assert sweeper.run() == 0
+    assert sweeper.run() == 1 and len(hub) == 0
+
+
+def test_sweep_respects_age_and_works_in_slices(ticks):
+    hub = GloomHub()
+    objects = [GloomObject(heap=hub) for _ in range(5)]
+    young = GloomObject(heap=hub)
+    # the pass starts on the next tick, everything from objects[3] back is old enough
+    sweeper = Sweeper(hub, max_age=young.created_at + 1 - objects[3].created_at)
+
+    steps = 1
+    while not sweeper.step(budget=0):
+        steps += 1
+    assert steps == 6
+    assert list(hub.objects.values()) == [objects[-1], young]
+
+
+def test_generations_belong_to_objects_not_addresses(ticks):
+    hub = GloomHub()
+    old = GloomObject(heap=hub)
+    repr(old)
+    sweeper = Sweeper(hub, max_age=0)
+    sweeper.run()
+    assert old.generation == 1
+
+    old.free()
+    new = GloomObject(heap=hub)
+    assert new.location == old.location and new.generation == 0
+    # a sweep that skips generation 1 still looks at the new object
+    assert sweeper.run() == 1 and len(hub) == 0
+
+    moved = GloomObject(location=7, heap=hub)
+    repr(moved)
+    sweeper.run()
+    hub.compact()
+    assert moved.location == 0 and moved.generation == 1 and moved.references == 1
+
+
+def test_a_pass_costs_what_is_live_not_how_high_addresses_go(ticks):
+    hub = GloomHub()
+    far = GloomObject(location=2**40, heap=hub)
+    named = GloomObject(location="named", heap=hub)
+    warm = GloomObject(heap=hub)
+    repr(warm)
+    sweeper = Sweeper(hub, max_age=0)
+
+    steps = 1
+    while not sweeper.step(budget=0):
+        steps += 1
+    # one object a step, however far apart their locations are
+    assert steps == 3 and list(hub.objects.values()) == [warm]
+    assert far.location not in hub and named.location not in hub
+    assert hub.listed == [warm.location] and hub.listed_at == {warm.location: 0}
+
+
+def test_listing_keeps_up_with_every_store_and_pop():
+    hub = ConcurrentHub()
+    objects = [GloomObject(heap=hub) for _ in range(5)]
+    assert hub.listing() == [0, 1, 2, 3, 4]
+    objects[1].free()
+    objects[4].move("elsewhere")
+    GloomObject(heap=hub)
+    hub.free_location(0)
+    assert sorted(map(str, hub.listed)) == sorted(map(str, hub.objects))
+    assert all(hub.listed[i] == key for key, i in hub.listed_at.items())
@@ -0,0 +1,128 @@
+import sys
+from threading import Thread
+
+from gloom.gloom import GloomObject
+from gloom.hub import GloomHub
+from gloom.threadsafe import ConcurrentHub
+
+
+def together(count, target, *args):
+    threads = [Thread(target=target, args=args) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_references_from_many_threads_all_count():
+    hub = ConcurrentHub(stripes=4)
+    objects = [GloomObject(heap=hub) for _ in range(8)]
+    locations = [o.location for o in objects] * 2_000
+
+    together(8, hub.ref_many, locations)
+    assert [o.references for o in objects] == [16_000] * 8
+    assert hub.total_references == hub.global_references == 128_000
+
+    o = objects[0]
+    o.references = 0
+    assert hub.total_references == 112_000
+
+
+def test_moves_keep_objects_findable_and_counted():
+    hub = ConcurrentHub(stripes=8)
+    objects = [GloomObject(heap=hub, location=i * 1000) for i in range(4)]
+    assert objects[1]._lock is hub.stripe(1000).lock
+
+    def move_about(o):
+        for _ in range(200):
+            o.move(o.location + 1)
+
+    def reference_all():
+        for _ in range(50):
+            hub.ref_all()
+
+    threads = [Thread(target=move_about, args=(o,)) for o in objects] + [Thread(target=reference_all)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(hub.keys()) == [200, 1200, 2200, 3200]
+    assert all(hub[o.location] is o and o._lock is hub.stripe(o.location).lock for o in objects)
+    # 2 references per move (move and the location setter), 1 per ref_all
+    assert [o.references for o in objects] == [450] * 4
+    assert hub.total_references == 1800
+
+    hub.pop(200)
+    assert objects[0]._lock is None and objects[0].tallies == () and hub.total_references == 1350
+
+
+def test_duplicates_and_free_all():
+    hub = ConcurrentHub()
+    o = GloomObject(heap=hub, location="a")
+    hub["b"] = o
+    assert hub.duplicates == 1
+    hub.ref_all()
+    assert o.references == 1 and hub.total_references == 2
+
+    del hub["b"]
+    assert hub.duplicates == 0 and hub.total_references == 1
+    hub.free_all()
+    assert len(hub) == 0 and hub.total_references == 0
+
+
+class StaleOnce(dict):
+    """ Answers the first get as though key were still empty, like a read racing a store """
+
+    stale = True
+
+    def get(self, key, default=None):
+        if self.stale:
+            self.stale = False
+            return default
+        return super().get(key, default)
+
+
+def test_store_starts_over_if_what_it_replaces_changed_before_it_locked():
+    hub, other = ConcurrentHub(stripes=1), ConcurrentHub(stripes=1)
+    current = GloomObject(heap=other)
+    hub.store(0, current)
+    hub.objects = StaleOnce(hub.objects)
+
+    held = []
+    detach_from = hub.detach_from
+    hub.detach_from = lambda stripe, value: held.append(value._lock.locked()) or detach_from(stripe, value)
+    replacement = GloomObject(heap=GloomHub())
+    hub.store(0, replacement)
+    assert held == [True] and hub[0] is replacement and current.tallies == (other.stripes[0].tally,)
+
+
+def test_moving_an_object_where_it_already_is_leaves_it_there():
+    hub = ConcurrentHub()
+    o = GloomObject(location=3, heap=hub)
+    o.move(3)
+    assert hub[3] is o and o.tallies == (hub.stripe(3).tally,)
+    assert hub.global_references == o.references
+
+
+def test_walking_every_object_while_others_store_and_pop():
+    hub = ConcurrentHub()
+    objects = [GloomObject(heap=hub) for _ in range(20000)]
+    done = []
+
+    def churn():
+        for _ in range(2000):
+            GloomObject(heap=hub).free()
+        done.append(True)
+
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        worker = Thread(target=churn)
+        worker.start()
+        while not done:
+            hub.ref_all()
+        worker.join()
+    finally:
+        sys.setswitchinterval(previous)
+    assert all(o.references >= 1 for o in objects)
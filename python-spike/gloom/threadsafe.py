@@ -0,0 +1,261 @@
+""" A GloomHub that several threads can use at once.
+
+    Locations are spread over a fixed number of stripes by hash, and each stripe has a
+    lock and a Tally of its own. Storing, popping and moving take only the locks of the
+    stripes involved, so threads working on different locations rarely wait for each
+    other, and no single tally is bumped by every thread.
+
+    Every GloomObject stored here is given the lock of the stripe it lives in, and
+    reference() and the references setter take it, which makes reference counting
+    atomic whatever thread the reference comes from. Moving an object to a location in
+    another stripe hands it that stripe's lock. An object is only ever guarded by one
+    hub's lock, so an object shared between threads should live in one ConcurrentHub.
+
+    Which locks an update needs depends on what's stored where, which can change
+    until they're held. So every update reads that, takes the locks, checks under them
+    that the objects it's about to touch are still guarded by locks it holds, and starts
+    over if not. Whatever walks every object (ref_all, repr) walks a copy taken under
+    every stripe lock, so stores and pops on other threads can't trip it up. Looking up
+    a single location (ref_many, get, allocate's check for a taken address) is one dict
+    lookup and needs no lock.
+
+    compact() is the exception to all of this: it moves everything, and should only run
+    while no other thread is using the hub.
+"""
+
+from threading import Lock
+
+from gloom.hub import GloomHub, Tally
+
+
+class Stripe:
+
+    __slots__ = ("lock", "tally")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.tally = Tally()
+
+
+class Holding:
+    """ Hold several locks at once, always taken in the same order so two threads taking
+        overlapping sets can't deadlock
+    """
+
+    __slots__ = ("locks",)
+
+    def __init__(self, *locks):
+        self.locks = sorted({id(lock): lock for lock in locks if lock is not None}.items())
+
+
+    def __enter__(self):
+        for _, lock in self.locks:
+            lock.acquire()
+
+
+    def __exit__(self, *exc_info):
+        for _, lock in reversed(self.locks):
+            lock.release()
+
+
+    def guards(self, *objects):
+        """ Whether every one of objects is unguarded or guarded by a lock held here """
+        held = {key for key, _ in self.locks}
+        return all((lock := getattr(o, "_lock", None)) is None or id(lock) in held for o in objects)
+
+
+def lock_of(o):
+    return getattr(o, "_lock", None)
+
+
+class ConcurrentHub(GloomHub):
+
+    def __init__(self, stripes=64):
+        super().__init__()
+        self.stripes = [Stripe() for _ in range(stripes)]
+        self.tallies = frozenset(stripe.tally for stripe in self.stripes)
+        # guards the address space and the duplicates count
+        self.bookkeeping = Lock()
+
+
+    def stripe(self, location):
+        return self.stripes[hash(location) % len(self.stripes)]
+
+
+    @property
+    def total_references(self):
+        return sum(stripe.tally.total_references for stripe in self.stripes)
+
+
+    @total_references.setter
+    def total_references(self, total):
+        first = self.stripes[0].tally
+        first.total_references += total - self.total_references
+
+
+    @property
+    def global_references(self):
+        return self.total_references
+
+
+    def allocate(self):
+        with self.bookkeeping:
+            return super().allocate()
+
+
+    def vacated(self, key):
+        with self.bookkeeping:
+            super().vacated(key)
+
+
+    def listing(self):
+        with Holding(*(stripe.lock for stripe in self.stripes)):
+            return super().listing()
+
+
+    def add_listed(self, key):
+        with self.bookkeeping:
+            super().add_listed(key)
+
+
+    def remove_listed(self, key):
+        with self.bookkeeping:
+            super().remove_listed(key)
+
+
+    def attach_to(self, stripe, value):
+        """ attach, for the stripe value is being stored in. Callers hold its lock. """
+        if (tallies := getattr(value, "tallies", None)) is None:
+            return
+        if not self.tallies.isdisjoint(tallies):
+            with self.bookkeeping:
+                self.duplicates += 1
+        value.tallies = tallies + (stripe.tally,)
+        stripe.tally.total_references += value.references
+        if value._lock is None:
+            value._lock = stripe.lock
+
+
+    def detach_from(self, stripe, value):
+        """ detach, for the stripe value is leaving. Callers hold its lock. """
+        if (tallies := getattr(value, "tallies", None)) is None:
+            return
+        index = tallies.index(stripe.tally)
+        value.tallies = tallies = tallies[:index] + tallies[index + 1:]
+        if not self.tallies.isdisjoint(tallies):
+            with self.bookkeeping:
+                self.duplicates -= 1
+        stripe.tally.total_references -= value.references
+
+
+    def store(self, key, value):
+        stripe = self.stripe(key)
+        while True:
+            previous = self.objects.get(key)
+            with (holding := Holding(stripe.lock, lock_of(value), lock_of(previous))):
+                previous = self.objects.get(key)
+                if not holding.guards(value, previous):
+                    # moved or replaced before the locks were ours
+                    continue
+                if previous is not None:
+                    self.detach_from(stripe, previous)
+                    self.released(stripe, previous)
+                elif self.listed is not None:
+                    self.add_listed(key)
+                self.objects[key] = value
+                self.attach_to(stripe, value)
+                break
+
+
+    def released(self, stripe, value):
+        """ value no longer lives in stripe: stop guarding it with the stripe's lock """
+        if getattr(value, "_lock", None) is stripe.lock:
+            value._lock = None
+
+
+    def pop(self, key, default=None):
+        stripe = self.stripe(key)
+        while True:
+            value = self.objects.get(key)
+            with (holding := Holding(stripe.lock, lock_of(value))):
+                if key not in self.objects:
+                    return default
+                value = self.objects[key]
+                if not holding.guards(value):
+                    continue
+                self.removed(stripe, key, value)
+                break
+        self.vacated(key)
+        return value
+
+
+    def discard(self, key, value):
+        stripe = self.stripe(key)
+        while True:
+            with (holding := Holding(stripe.lock, lock_of(value))):
+                if self.objects.get(key) is not value:
+                    return False
+                if not holding.guards(value):
+                    continue
+                self.removed(stripe, key, value)
+                break
+        self.vacated(key)
+        return True
+
+
+    def removed(self, stripe, key, value):
+        """ Take value out from under key. Callers hold the locks of both. """
+        del self.objects[key]
+        self.detach_from(stripe, value)
+        self.released(stripe, value)
+        if self.listed is not None:
+            self.remove_listed(key)
+
+
+    def __delitem__(self, key):
+        if key not in self.objects:
+            raise KeyError(key)
+        self.pop(key)
+
+
+    def relocate(self, old, new, value):
+        """ Move value from old to new in one step: no other thread sees it missing from
+            both, or counts a reference to it against the wrong stripe
+        """
+        if old == new:
+            return
+        source, target = self.stripe(old), self.stripe(new)
+        while True:
+            previous = self.objects.get(new)
+            with (holding := Holding(source.lock, target.lock, lock_of(value), lock_of(previous))):
+                previous = self.objects.get(new)
+                if not holding.guards(value, previous):
+                    continue
+                self.detach_from(source, self.objects.pop(old))
+                if self.listed is not None:
+                    self.remove_listed(old)
+                if previous is not None:
+                    self.detach_from(target, previous)
+                    self.released(target, previous)
+                elif self.listed is not None:
+                    self.add_listed(new)
+                self.objects[new] = value
+                self.attach_to(target, value)
+                if value._lock is source.lock:
+                    value._lock = target.lock
+                break
+        self.vacated(old)
+
+
+    def objects_now(self):
+        """ A copy of the store, taken while no other thread can change it """
+        with Holding(*(stripe.lock for stripe in self.stripes)):
+            return dict(self.objects)
+
+
+    def free_all(self):
+        with Holding(*(stripe.lock for stripe in self.stripes)):
+            stripes = self.stripes
+            super().free_all()
+            self.stripes = [Stripe() for _ in stripes]
+            self.tallies = frozenset(stripe.tally for stripe in self.stripes)